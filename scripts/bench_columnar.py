@@ -0,0 +1,94 @@
+"""Benchmark: scraped funds kept as a list of dicts vs. ColumnarRows.
+
+For N synthetic fund rows (default 50k) reports, with tracemalloc:
+- retained memory of the accumulated rows
+- peak while passing them through one State.model_dump/model_validate hop
+- peak and time of building the output DataFrame (old pad-per-column build vs. to_pandas)
+
+    poetry run python scripts/bench_columnar.py [--rows 50000]
+"""
+from __future__ import annotations
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+import pandas as pd
+
+from funds_agentic.state import State, Config, RunMeta
+from funds_agentic.nodes.normalize_write_node import FUNDS_COLUMNS, new_fund_rows
+
+
+def synthetic_rows(n: int, seed: int = 0):
+    rnd = random.Random(seed)
+    sectors = [f"IA Sector {i}" for i in range(40)]
+    for i in range(n):
+        sector = rnd.choice(sectors)
+        # fresh strings per row, as Playwright's inner_text() returns them
+        yield {
+            "date": "".join(["01/01/25", " 09:00"]), "fundName": f"Fund {i}",
+            "Quartile": rnd.randint(1, 4), "FERisk": rnd.randint(1, 200),
+            "3m": rnd.uniform(-10, 10), "6m": rnd.uniform(-10, 10), "1y": rnd.uniform(-20, 20),
+            "3y": rnd.uniform(-30, 30), "5y": rnd.uniform(-40, 40),
+            "url": f"https://www.trustnet.com/factsheets/o/f{i}/fund-{i}", "Hold": i % 10 == 0,
+            "Holding%": 1.5 if i % 10 == 0 else None, "Sector": "".join([sector]),
+            "SectorUrl": "".join(["https://www.trustnet.com/fund/sector/", sector.lower()]),
+            "price": f"{rnd.uniform(50, 900):.2f}", "fundKey": f"O:F{i}",
+        }
+
+
+def legacy_frame(rows) -> pd.DataFrame:
+    df = pd.DataFrame(rows)
+    for c in FUNDS_COLUMNS:
+        if c not in df.columns:
+            df[c] = None
+    return df[FUNDS_COLUMNS]
+
+
+def measure(fn):
+    """-> (result, seconds, retained MiB, peak MiB) of ``fn()``."""
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - t0
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, current / 2**20, peak / 2**20
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=50_000)
+    args = ap.parse_args()
+    n = args.rows
+    base = State(meta=RunMeta(run_id="bench", run_date="2025-01-01", timestamp="01/01/25 09:00"),
+                 config=Config(output_dir="."))
+
+    def accumulate_columnar():
+        store = new_fund_rows()
+        for row in synthetic_rows(n):
+            store.append(row)
+        return store
+
+    def hop(rows):
+        return lambda: State.model_validate(base.model_copy(update={"fund_rows_raw": rows}).model_dump())
+
+    print(f"{n} rows, {len(FUNDS_COLUMNS)} output columns")
+    print(f"{'':<26}{'time s':>9}{'retained MiB':>15}{'peak MiB':>11}")
+    for name, build, frame in (
+        ("list of dicts", lambda: list(synthetic_rows(n)), legacy_frame),
+        ("ColumnarRows", accumulate_columnar, lambda store: store.to_pandas(FUNDS_COLUMNS)),
+    ):
+        rows, t, kept, peak = measure(build)
+        print(f"{name + ' accumulate':<26}{t:9.2f}{kept:15.1f}{peak:11.1f}")
+        _, t, kept, peak = measure(hop(rows))
+        print(f"{'  state hop':<26}{t:9.2f}{kept:15.1f}{peak:11.1f}")
+        _, t, kept, peak = measure(lambda rows=rows: frame(rows))
+        print(f"{'  DataFrame build':<26}{t:9.2f}{kept:15.1f}{peak:11.1f}")
+        del rows
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Benchmark: streaming Excel write-back vs. openpyxl load/edit/save.
+
+Builds a synthetic tracking workbook (default 50k fund rows plus an untouched second
+sheet), then writes scraped results back next to the URL column both ways and reports
+wall time and peak Python allocations (tracemalloc).
+
+    poetry run python scripts/bench_excel_writeback.py [--rows 50000]
+"""
+from __future__ import annotations
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+import openpyxl
+
+from funds_agentic.utils.excel_sink import write_back_excel
+from funds_agentic.utils.writeback import RESULT_COLUMNS, locate_columns
+
+
+def build_workbook(path: str, rows: int) -> list:
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("TrackingList")
+    ws.append(["Holdings"])
+    ws.append([])
+    ws.append(["Name", "Notes", "Sector", "Owner", "Added", "URL", "Hold", "Holding%"])
+    results = []
+    rnd = random.Random(0)
+    for i in range(rows):
+        url = f"https://www.trustnet.com/factsheets/o/fund{i}/fund-{i}"
+        ws.append([f"Fund {i}", "note", "IA Global", "me", "2024-01-01", url,
+                   "hold" if i % 10 == 0 else "", 1.5 if i % 10 == 0 else None])
+        results.append({
+            "url": url, "price": f"{rnd.uniform(50, 500):.2f}",
+            "3m": round(rnd.uniform(-10, 10), 2), "6m": round(rnd.uniform(-10, 10), 2),
+            "1y": round(rnd.uniform(-20, 20), 2), "3y": round(rnd.uniform(-30, 30), 2),
+            "5y": round(rnd.uniform(-40, 40), 2), "Quartile": rnd.randint(1, 4),
+            "FERisk": rnd.randint(1, 200), "Sector": "IA Global",
+        })
+    other = wb.create_sheet("History")
+    for i in range(rows):
+        other.append([i, f"row {i}", i * 0.5])
+    wb.save(path)
+    return results
+
+
+def openpyxl_write_back(path: str, results: list) -> None:
+    wb = openpyxl.load_workbook(path)
+    ws = wb["TrackingList"]
+    headers = [c.value for c in ws[3]]
+    url_idx, positions, appended = locate_columns(headers, {})
+    for idx, name in appended:
+        ws.cell(3, idx + 1, name)
+    by_url = {r["url"]: r for r in results}
+    for row in ws.iter_rows(min_row=4):
+        res = by_url.get(row[url_idx].value)
+        if res:
+            for col, idx in positions.items():
+                ws.cell(row[0].row, idx + 1, res.get(col))
+    wb.save(path)
+
+
+def measure(fn, src: str, workdir: str, results: list) -> tuple[float, float]:
+    path = os.path.join(workdir, "work.xlsx")
+    shutil.copy(src, path)
+    t0 = time.perf_counter()
+    fn(path, results)
+    elapsed = time.perf_counter() - t0
+
+    shutil.copy(src, path)
+    tracemalloc.start()
+    fn(path, results)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=50_000)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        src = os.path.join(workdir, "tracking.xlsx")
+        results = build_workbook(src, args.rows)
+        print(f"workbook: {args.rows} rows, {os.path.getsize(src) / 2**20:.1f} MiB, "
+              f"{len(RESULT_COLUMNS)} result columns")
+
+        cases = {
+            "streaming (excel_sink)": lambda p, r: write_back_excel(p, r, "TrackingList", 3, {}),
+            "openpyxl load/save": openpyxl_write_back,
+        }
+        for name, fn in cases.items():
+            elapsed, peak = measure(fn, src, workdir, results)
+            print(f"{name:<24} {elapsed:8.2f} s   peak alloc {peak:8.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""Micro-benchmarks for the scraper's Python hot paths, with a regression gate.
+
+- parsing: ``parse_fund_figures`` (single pass, precompiled) vs. the reference helpers
+  ``extract_perf_from_table_text`` + ``find_quartile_from_text`` + the price token loop,
+  after checking that both give identical results on a fixture corpus
+- load_excel: a synthetic tracking workbook
+- funds DataFrame: ``_to_df_funds`` as used by normalize_write_node
+
+    poetry run python scripts/bench_parsing.py [--rows 50000] [--save base.json]
+    poetry run python scripts/bench_parsing.py --baseline base.json [--tolerance 0.25]
+
+Exits 1 if the parsers disagree on any fixture, or if a timing is slower than the
+baseline by more than ``--tolerance``.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+import openpyxl
+
+from funds_agentic.utils.parsing import (
+    parse_fund_figures, extract_perf_from_table_text, find_quartile_from_text, clean_price_token,
+)
+from funds_agentic.utils.io_excel import load_excel
+from funds_agentic.nodes.normalize_write_node import _to_df_funds, new_fund_rows
+
+HEADER = "3 m\t6 m\t1 y\t3 y\t5 y"
+
+# hand-written edge cases: (performance table text, unit info table text)
+FIXTURES = [
+    ("Performance\n3 m\t6 m\t1 y\t3 y\t5 y\n1.5%\t2.5%\t-3.0%\t10.2%\t20.1%\nQuartile Ranking\n2\t1\t3\t2\t1\n",
+     "Price\n123.45p\nYield 1.2%"),
+    ("3 m 6 m 1 y 3 y 5 y\n-\t-\t4.1%\t-\t-\nQuartile Ranking\n-\n", "Price\nÂ£1.23\n"),
+    ("Fund\n  3m   6m  1y 3y 5y \n\n\n 0.1 % 0.2 % 0.3 %\n", "Bid/Offer\nn/a\n98.10p"),
+    ("3 m 6 m 1 y\n1.0 2.0 3.0\nQuartile Ranking\n4\n", None),
+    ("no header here\n1 2 3 4 5\nQuartile Ranking\n", ""),
+    ("Quartile Ranking\nn/a\nPerformance\n3 m 6 m\n7 8\nQuartile Ranking\nRank 3 of 4\n", "%%\n12%p"),
+    ("3 m 6 m 1 y 3 y 5 y\n", "price 1.2.3"),
+    ("3 m 6 m 1 y 3 y 5 y\nNaN inf 1e3 +2 .5 6\n", "  \n\t7"),
+    ("Quartile Ranking Quartile Ranking\nQuartile Ranking\n1\n3 m 6 m\n↑ 1.1 ↓ -2.2\n", "Unit\n 101.5p"),
+    ("", None),
+]
+
+
+def reference_parse(perf_text: str, unit_text: str | None) -> dict:
+    out = dict(extract_perf_from_table_text(perf_text))
+    out["Quartile"] = find_quartile_from_text(perf_text)
+    price = None
+    if unit_text:
+        for t in unit_text.replace("%", "").split():
+            if any(ch.isdigit() for ch in t):
+                price = clean_price_token(t)
+                break
+    out["price"] = price
+    return out
+
+
+def synthetic_corpus(n: int, seed: int = 0) -> list:
+    rnd = random.Random(seed)
+    corpus = []
+    for _ in range(n):
+        vals = ["-" if rnd.random() < 0.1 else f"{rnd.uniform(-40, 40):.2f}%" for _ in range(5)]
+        sep = rnd.choice(["\t", " ", "  \t "])
+        lines = ["Performance", "Fund name here", sep.join(HEADER.split("\t")), sep.join(vals),
+                 "Sector average", sep.join(f"{rnd.uniform(-40, 40):.2f}%" for _ in range(5))]
+        if rnd.random() < 0.9:
+            lines += ["Quartile Ranking", sep.join(str(rnd.randint(1, 4)) for _ in range(5))]
+        lines += ["", "Data as at 01/01/2025"] * rnd.randint(0, 3)
+        unit = f"Price\n{rnd.uniform(50, 900):.2f}p\nYield {rnd.uniform(0, 5):.2f}%"
+        corpus.append(("\n".join(lines), unit))
+    return corpus
+
+
+def per_call_us(fn, corpus: list, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for perf_text, unit_text in corpus:
+            fn(perf_text, unit_text)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(corpus) * 1e6
+
+
+def check_equivalence(corpus: list) -> int:
+    mismatches = 0
+    for perf_text, unit_text in corpus:
+        want, got = reference_parse(perf_text, unit_text), parse_fund_figures(perf_text, unit_text)
+        if repr(want) != repr(got):  # repr so NaN compares equal to NaN
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"MISMATCH {perf_text[:60]!r}\n  reference {want}\n  compiled  {got}")
+    return mismatches
+
+
+def build_tracking_workbook(path: str, rows: int) -> None:
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("TrackingList")
+    ws.append(["Holdings"])
+    ws.append([])
+    ws.append(["Name", "Sector", "URL", "Hold", "Holding%"])
+    for i in range(rows):
+        ws.append([f"Fund {i}", "IA Global", f"https://www.trustnet.com/factsheets/o/f{i}/fund-{i}",
+                   "hold" if i % 10 == 0 else "", "1.5%" if i % 10 == 0 else None])
+    wb.save(path)
+
+
+def synthetic_fund_rows(n: int, seed: int = 0) -> list:
+    rnd = random.Random(seed)
+    return [{
+        "date": "01/01/25 09:00", "fundName": f"Fund {i}", "Quartile": rnd.randint(1, 4),
+        "FERisk": rnd.randint(1, 200), "3m": rnd.uniform(-10, 10), "6m": rnd.uniform(-10, 10),
+        "1y": rnd.uniform(-20, 20), "3y": rnd.uniform(-30, 30), "5y": rnd.uniform(-40, 40),
+        "url": f"https://www.trustnet.com/factsheets/o/f{i}/fund-{i}", "Hold": i % 10 == 0,
+        "Holding%": 1.5 if i % 10 == 0 else None, "Sector": "IA Global",
+        "SectorUrl": None, "price": f"{rnd.uniform(50, 900):.2f}", "fundKey": f"O:F{i}",
+    } for i in range(n)]
+
+
+def timed(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=50_000, help="rows for the DataFrame build")
+    ap.add_argument("--excel-rows", type=int, default=5_000, help="rows in the tracking workbook")
+    ap.add_argument("--corpus", type=int, default=2_000, help="synthetic parser fixtures")
+    ap.add_argument("--save", type=str, help="write timings to this JSON file")
+    ap.add_argument("--baseline", type=str, help="compare timings against this JSON file")
+    ap.add_argument("--tolerance", type=float, default=0.25)
+    args = ap.parse_args()
+
+    corpus = FIXTURES + synthetic_corpus(args.corpus)
+    mismatches = check_equivalence(corpus)
+    print(f"parser fixtures: {len(corpus)}, mismatches: {mismatches}")
+
+    timings = {
+        "parse_reference_us": per_call_us(reference_parse, corpus),
+        "parse_compiled_us": per_call_us(parse_fund_figures, corpus),
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "tracking.xlsx")
+        build_tracking_workbook(path, args.excel_rows)
+        timings["load_excel_s"] = timed(lambda: load_excel(path, "TrackingList", 3, {}))
+    rows = new_fund_rows()  # what funds_node hands to normalize_write_node
+    rows.extend(synthetic_fund_rows(args.rows))
+    timings["to_df_funds_s"] = timed(lambda: _to_df_funds(rows))
+
+    for name, value in timings.items():
+        print(f"{name:<22} {value:10.3f}")
+    print(f"compiled parser speed-up: "
+          f"{timings['parse_reference_us'] / timings['parse_compiled_us']:.1f}x")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(timings, f, indent=1)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            base = json.load(f)
+        for name, value in timings.items():
+            if name == "parse_reference_us":
+                continue  # the comparator, not a shipped code path
+            if name in base and value > base[name] * (1 + args.tolerance):
+                regressions.append(name)
+                print(f"REGRESSION {name}: {value:.3f} vs baseline {base[name]:.3f}")
+    return 1 if mismatches or regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
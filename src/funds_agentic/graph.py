@@ -2,31 +2,48 @@
 Each node is a python function that takes/returns a {"state": ...} dict.
 """
 from __future__ import annotations
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Optional
 from langgraph.graph import StateGraph, END
 from .nodes.config_node import config_node
 from .nodes.input_node import input_node
 from .nodes.browser_node import browser_node
+from .nodes.canary_node import canary_node, after_canary
 from .nodes.sectors_node import sectors_node
 from .nodes.funds_node import funds_node
+from .nodes.relative_perf_node import relative_perf_node
 from .nodes.normalize_write_node import normalize_write_node
+from .nodes.delta_node import delta_node
+from .nodes.writeback_node import writeback_node
 
 
-def build_graph():
+def build_graph(node_wrapper: Optional[Callable[[str, Callable], Callable]] = None):
+    """``node_wrapper(name, fn)`` may wrap every node (used by ``--profile``)."""
     g = StateGraph(dict)
-    g.add_node("config_node", config_node)
-    g.add_node("input_node", input_node)
-    g.add_node("browser_node", browser_node)
-    g.add_node("sectors_node", sectors_node)
-    g.add_node("funds_node", funds_node)
-    g.add_node("normalize_write_node", normalize_write_node)
+
+    def add(name: str, fn: Callable) -> None:
+        g.add_node(name, node_wrapper(name, fn) if node_wrapper else fn)
+
+    add("config_node", config_node)
+    add("input_node", input_node)
+    add("browser_node", browser_node)
+    add("canary_node", canary_node)
+    add("sectors_node", sectors_node)
+    add("funds_node", funds_node)
+    add("relative_perf_node", relative_perf_node)
+    add("normalize_write_node", normalize_write_node)
+    add("delta_node", delta_node)
+    add("writeback_node", writeback_node)
 
     g.set_entry_point("config_node")
     g.add_edge("config_node", "input_node")
     g.add_edge("input_node", "browser_node")
-    g.add_edge("browser_node", "sectors_node")
+    g.add_edge("browser_node", "canary_node")
+    g.add_conditional_edges("canary_node", after_canary, ["sectors_node", END])
     g.add_edge("sectors_node", "funds_node")
-    g.add_edge("funds_node", "normalize_write_node")
-    g.add_edge("normalize_write_node", END)
+    g.add_edge("funds_node", "relative_perf_node")
+    g.add_edge("relative_perf_node", "normalize_write_node")
+    g.add_edge("normalize_write_node", "delta_node")
+    g.add_edge("delta_node", "writeback_node")
+    g.add_edge("writeback_node", END)
 
     return g.compile()
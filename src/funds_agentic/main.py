@@ -1,9 +1,14 @@
 # --- add at the top (new imports)
 import argparse
+import os
+import random
 import sys
+import time
 
 from funds_agentic.graph import build_graph
+from funds_agentic.nodes.browser_node import shutdown_browser
 from funds_agentic.utils.logging_setup import setup_logger
+from funds_agentic.utils.profiling import RunProfiler
 
 logger = setup_logger()
 
@@ -14,6 +19,8 @@ def _parse_vis_args(argv):
     p.add_argument("--graph-out", type=str, default=None)
     p.add_argument("--graph-format", type=str,
                    default="png", choices=["png", "mermaid"])
+    # --profile [RATE]: profile this run (or a random RATE fraction of runs/cycles)
+    p.add_argument("--profile", type=float, nargs="?", const=1.0, default=None)
     vis_args, remaining = p.parse_known_args(argv)
     return vis_args, remaining
 
@@ -34,22 +41,31 @@ def _save_graph_visual(app, out_path: str, fmt: str):
                     "kv": {"path": out_path, "format": "mermaid"}})
 
 
-def cli() -> None:
-    # 1) Parse & REMOVE visualization flags from argv
-    vis, remaining = _parse_vis_args(sys.argv[1:])
-    # <- remove vis flags so config_node won't see them
-    sys.argv = [sys.argv[0]] + remaining
+def _write_profile(profiler, state: dict) -> None:
+    out_dir = os.path.join(state.get("config", {}).get("output_dir", "."), "profile",
+                           state.get("meta", {}).get("run_id", "run"))
+    paths = profiler.write(out_dir)
+    logger.info("profile_written", extra={"kv": paths})
 
-    # 2) Build compiled graph
-    app = build_graph()
 
-    # 3) Optionally save graph visualization before running
-    if vis.graph_out:
-        _save_graph_visual(app, vis.graph_out, vis.graph_format)
-
-    # 4) Run pipeline
-    result = app.invoke({})
+def _run_once(app, profiler=None, profile_rate: float = 0.0) -> dict:
+    """Invoke the graph once, log the summary and release the browser."""
+    profiling = profiler is not None and random.random() < profile_rate
+    if profiling:
+        profiler.start()
+    try:
+        result = app.invoke({})
+    finally:
+        if profiling:
+            profiler.stop()
+        shutdown_browser()
     state = result.get("state", {})
+    if profiling:
+        _write_profile(profiler, state)
+    if state.get("error"):
+        logger.error("run_aborted", extra={"kv": {
+            "error": state["error"], "canary_report": state.get("canary_report_path")}})
+        return state
     funds_csv = state.get("funds_csv_path")
     sectors_csv = state.get("sectors_csv_path")
     failed = state.get("failed_urls", [])
@@ -57,7 +73,49 @@ def cli() -> None:
         "funds_csv": funds_csv,
         "sectors_csv": sectors_csv,
         "failed_urls": len(failed),
+        "dead_urls": len(state.get("dead_urls", [])),
+        "deferred": state.get("stats", {}).get("deferred", 0),
+        "degraded": state.get("degraded", []),
     }})
+    return state
+
+
+def cli() -> None:
+    # 1) Parse & REMOVE visualization flags from argv
+    vis, remaining = _parse_vis_args(sys.argv[1:])
+    # <- remove vis flags so config_node won't see them
+    sys.argv = [sys.argv[0]] + remaining
+
+    # 2) Build compiled graph (nodes wrapped for profiling when requested)
+    profiler = RunProfiler() if vis.profile else None
+    app = build_graph(profiler.wrap if profiler else None)
+
+    # 3) Optionally save graph visualization before running
+    if vis.graph_out:
+        _save_graph_visual(app, vis.graph_out, vis.graph_format)
+
+    # 4) Run pipeline (repeatedly in scheduler mode)
+    started = time.time()
+    state = _run_once(app, profiler, vis.profile or 0.0)
+    every_min = state.get("config", {}).get("schedule_every_min")
+    if not every_min:
+        if state.get("error"):
+            sys.exit(1)
+        return
+    cycle = 1
+    while True:
+        wait_sec = max(0.0, every_min * 60 - (time.time() - started))
+        logger.info("schedule_sleep", extra={"kv": {
+            "cycle": cycle, "sleep_sec": int(wait_sec)}})
+        time.sleep(wait_sec)
+        cycle += 1
+        started = time.time()
+        try:
+            _run_once(app, profiler, vis.profile or 0.0)
+        except Exception as e:
+            # keep the scheduler alive; the next cycle retries everything
+            logger.error("cycle_failed", extra={"kv": {
+                "cycle": cycle, "error": str(e)[:200]}})
 
 
 if __name__ == "__main__":
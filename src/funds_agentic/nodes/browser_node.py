@@ -8,6 +8,9 @@ from ..selectors import COOKIE_ALLOW_ALL, INVESTOR_LABEL, AGREE_BUTTON
 
 logger = setup_logger()
 
+# (playwright, browser) pairs launched by this process, closed by shutdown_browser()
+_launched: list = []
+
 
 def _maybe_click(page, selector: str, name: str):
     try:
@@ -24,17 +27,40 @@ def _maybe_click(page, selector: str, name: str):
 @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=0.5, max=8))
 def _launch_context(headless: bool) -> BrowserContext:
     p = sync_playwright().start()
-    browser = p.chromium.launch(headless=headless)
+    try:
+        browser = p.chromium.launch(headless=headless)
+    except Exception:
+        p.stop()  # a second start() in this thread would fail on retry
+        raise
+    _launched.append((p, browser))
     ctx = browser.new_context()
     # open a page to trustnet root to perform consent
     page = ctx.new_page()
-    page.goto("https://www.trustnet.com/", timeout=30000)
+    try:
+        page.goto("https://www.trustnet.com/", timeout=30000)
+    except Exception:
+        shutdown_browser()
+        raise
     _maybe_click(page, COOKIE_ALLOW_ALL, "cookie_allow_all")
     _maybe_click(page, INVESTOR_LABEL, "investor_private")
     _maybe_click(page, AGREE_BUTTON, "agree_terms")
     return ctx
 
 
+def shutdown_browser() -> None:
+    """Close every browser we launched and stop Playwright (between scheduler cycles)."""
+    while _launched:
+        p, browser = _launched.pop()
+        try:
+            browser.close()
+        except Exception:
+            pass
+        try:
+            p.stop()
+        except Exception:
+            pass
+
+
 def browser_node(state: Dict[str, Any]) -> Dict[str, Any]:
     st = State.model_validate(state["state"])  # hydrate
     ctx = _launch_context(st.config.headless)
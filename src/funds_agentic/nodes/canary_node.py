@@ -0,0 +1,159 @@
+"""Canary pre-flight: scrape a small sample of funds and the first sectors page before the
+full run, so a DOM change or an IP block fails in seconds instead of after every URL has
+gone through its retry/timeout chain.
+
+A fund sample fails when scraping raises or a field in ``CANARY_FUND_FIELDS`` does not
+parse; the sectors page fails when it yields no rows or a field in
+``CANARY_SECTOR_FIELDS`` is missing from most rows. 404/redirected funds say nothing
+about the site as a whole and are left out of the failure rate. Probes make a single
+attempt with at most ``CANARY_NAV_TIMEOUT_SEC``, so a blocked site is reported quickly.
+
+Verdict: ``pass``; ``degrade`` = skip the broken part (funds or sectors) and run the
+other; ``abort`` = both broken, or ``--canary-action abort``. A JSON report is written to
+``<output>/<date>_canary.json`` either way.
+"""
+from __future__ import annotations
+from typing import Dict, Any, List
+import json
+import os
+import time
+from tenacity import stop_after_attempt
+from langgraph.graph import END
+from ..state import State
+from ..utils.logging_setup import setup_logger
+from ..selectors import SECTORS_URL, CANARY_FUND_FIELDS, CANARY_SECTOR_FIELDS
+from ..utils.navigation import PermanentNavigationError
+from ..utils.negative_cache import NegativeCache
+from ..utils.fund_identity import fund_key
+from .funds_node import _open_page, _extract_fund
+from .sectors_node import _load_page, _extract_table_rows
+
+logger = setup_logger()
+
+CANARY_NAV_TIMEOUT_SEC = 15
+_single_attempt = dict(stop=stop_after_attempt(1), reraise=True)
+
+
+def _close(page) -> None:
+    if page is not None:
+        try:
+            page.close()
+        except Exception:
+            pass
+
+
+def _probe_fund(ctx, rec: Dict[str, Any], st: State) -> Dict[str, Any]:
+    url = rec["url"]
+    result: Dict[str, Any] = {"url": url, "ok": False, "missing": [], "error": None}
+    t0 = time.monotonic()
+    page = None
+    try:
+        page = _open_page.retry_with(**_single_attempt)(
+            ctx, rec.get("canonical_url") or url,
+            min(st.config.nav_timeout_sec, CANARY_NAV_TIMEOUT_SEC), st.config.nav_strategy)
+        row = _extract_fund(page, url, st.meta.timestamp, rec.get("hold", False),
+                            rec.get("holding_pct"))
+        result["missing"] = [f for f in CANARY_FUND_FIELDS if row.get(f) is None]
+        result["ok"] = not result["missing"]
+    except PermanentNavigationError as e:
+        result.update({"error": str(e), "inconclusive": True})
+    except Exception as e:
+        result["error"] = str(e)[:200]
+    finally:
+        _close(page)
+    result["elapsed_sec"] = round(time.monotonic() - t0, 2)
+    return result
+
+
+def _probe_sectors(ctx, st: State) -> Dict[str, Any]:
+    result: Dict[str, Any] = {"url": SECTORS_URL, "ok": False, "rows": 0, "missing": [], "error": None}
+    t0 = time.monotonic()
+    page = None
+    try:
+        page = _load_page.retry_with(**_single_attempt)(
+            ctx, SECTORS_URL, min(st.config.nav_timeout_sec, CANARY_NAV_TIMEOUT_SEC))
+        rows = _extract_table_rows(page)
+        result["rows"] = len(rows)
+        result["missing"] = [f for f in CANARY_SECTOR_FIELDS
+                             if sum(r.get(f) is None for r in rows) * 2 > len(rows)]
+        result["ok"] = bool(rows) and not result["missing"]
+    except Exception as e:
+        result["error"] = str(e)[:200]
+    finally:
+        _close(page)
+    result["elapsed_sec"] = round(time.monotonic() - t0, 2)
+    return result
+
+
+def _sample(st: State) -> List[Dict[str, Any]]:
+    """First ``canary_size`` funds that the negative cache does not already know to be dead."""
+    dead_cache = NegativeCache.load(st.config.output_dir)
+    sample = [rec for rec in st.fund_rows
+              if not dead_cache.is_dead(rec.get("fund_key") or fund_key(rec["url"]))]
+    return sample[:st.config.canary_size]
+
+
+def canary_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    st = State.model_validate(state["state"])  # hydrate
+    cfg = st.config
+    if cfg.canary_size <= 0:
+        return {"state": st.model_dump()}
+
+    t0 = time.monotonic()
+    funds = [_probe_fund(st.browser_ctx, rec, st) for rec in _sample(st)]
+    sectors = _probe_sectors(st.browser_ctx, st)
+
+    conclusive = [r for r in funds if not r.get("inconclusive")]
+    fund_failures = sum(not r["ok"] for r in conclusive)
+    failure_rate = fund_failures / len(conclusive) if conclusive else 0.0
+    broken = []
+    if conclusive and failure_rate >= cfg.canary_max_failure:
+        broken.append("funds")
+    if not sectors["ok"]:
+        broken.append("sectors")
+
+    if not broken:
+        verdict = "pass"
+    elif len(broken) == 2 or cfg.canary_action == "abort":
+        verdict = "abort"
+    else:
+        verdict = "degrade"
+
+    report = {
+        "run_id": st.meta.run_id,
+        "timestamp": st.meta.timestamp,
+        "verdict": verdict,
+        "broken": broken,
+        "threshold": cfg.canary_max_failure,
+        "funds": {"sampled": len(funds), "failed": fund_failures,
+                  "failure_rate": round(failure_rate, 3), "results": funds},
+        "sectors": sectors,
+        "elapsed_sec": round(time.monotonic() - t0, 2),
+    }
+    path = os.path.join(cfg.output_dir, f"{st.meta.run_date}_canary.json")
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+        st.canary_report_path = path
+    except OSError as e:
+        logger.error("write_failed", extra={
+            "kv": {"step": "canary_node", "path": path, "error": str(e)}})
+
+    kv = {"step": "canary_node", "verdict": verdict, "broken": broken,
+          "fund_failure_rate": round(failure_rate, 3), "sector_rows": sectors["rows"],
+          "report": st.canary_report_path, "elapsed_sec": report["elapsed_sec"]}
+    if verdict == "pass":
+        logger.info("canary_passed", extra={"kv": kv})
+    elif verdict == "degrade":
+        st.degraded = broken
+        logger.warning("canary_degraded", extra={"kv": kv})
+    else:
+        st.error = f"canary_failed: {', '.join(broken)} broken"
+        logger.error("canary_failed", extra={"kv": kv})
+    st.stats.update({"canary": verdict})
+    return {"state": st.model_dump()}
+
+
+def after_canary(state: Dict[str, Any]) -> str:
+    """Route: stop the graph after an aborted canary, otherwise go on scraping."""
+    return END if state["state"].get("error") else "sectors_node"
@@ -5,7 +5,8 @@ import time
 from datetime import datetime
 from pydantic import ValidationError
 from ..state import State, Config, RunMeta
-from ..utils.logging_setup import setup_logger
+from ..utils.navigation import NAV_STRATEGIES
+from ..utils.logging_setup import setup_logger, configure_logging, parse_sample_spec
 
 logger = setup_logger()
 
@@ -25,8 +26,39 @@ def build_arg_parser() -> argparse.ArgumentParser:
     p.add_argument("--col-holding", type=str)
     p.add_argument("--retries-per-url", type=int, default=2)
     p.add_argument("--nav-timeout", type=int, default=20)
+    p.add_argument("--nav-strategy", type=str, default="load", choices=list(NAV_STRATEGIES),
+                   help="load = wait for full page load; commit/domcontentloaded = return once the selectors we extract are present")
+    p.add_argument("--workers", type=int, default=1, metavar="N",
+                   help="Scrape funds in N crash-isolated worker processes, each with its own browser "
+                        "(1 = in-process, default; 0 = one per CPU core)")
+    p.add_argument("--canary-size", type=int, default=3, metavar="N",
+                   help="Pre-flight: scrape N funds + the first sectors page before the full run (0 = off)")
+    p.add_argument("--canary-max-failure", type=float, default=0.5, metavar="RATE",
+                   help="Canary fund failure rate (0..1) at which the run is degraded or aborted")
+    p.add_argument("--canary-action", type=str, default="degrade", choices=["degrade", "abort"],
+                   help="On a failed canary: degrade = skip the broken part (funds or sectors), "
+                        "abort = stop the run; both broken always aborts")
     p.add_argument("--row-start", type=int, default=3,
                    help="1-based row where the header row lives (e.g., 3 when headers are on row 3)")
+    p.add_argument("--dead-after-runs", type=int, default=3,
+                   help="Mark a fund dead after N runs in a row without a performance table")
+    p.add_argument("--dead-recheck-hours", type=float, default=24,
+                   help="First re-check interval for dead funds; doubles after each failed re-check")
+    p.add_argument("--write-back", nargs="?", const="columns", default=None, choices=["columns", "sheet"],
+                   help="Write results back into the input: 'columns' (default) next to each URL row, "
+                        "or 'sheet' = a new sheet named after the run date (Excel only)")
+    p.add_argument("--schedule-every", type=float, default=None, metavar="MIN",
+                   help="Scheduler mode: re-run the pipeline every MIN minutes, most urgent funds first")
+    p.add_argument("--cycle-budget", type=int, default=None, metavar="SEC",
+                   help="Stop starting new fund scrapes after SEC seconds; the rest are deferred")
+    p.add_argument("--held-refresh", type=float, default=60, metavar="MIN",
+                   help="Target refresh interval for held funds (scheduler priority)")
+    p.add_argument("--watch-refresh", type=float, default=360, metavar="MIN",
+                   help="Target refresh interval for watchlist funds (scheduler priority)")
+    p.add_argument("--log-format", type=str, default=os.getenv("LOG_FORMAT", "kv"),
+                   choices=["kv", "json"], help="Log line format: key=value or JSON lines")
+    p.add_argument("--log-sample", type=str, action="append", default=None, metavar="EVENT=RATE",
+                   help="Keep only RATE (0..1) of EVENT log lines, e.g. fund_scraped=0.1 (repeatable)")
     headless = p.add_mutually_exclusive_group()
     headless.add_argument("--headless", dest="headless",
                           action="store_true", help="Run browser headless (default)")
@@ -39,6 +71,9 @@ def build_arg_parser() -> argparse.ArgumentParser:
 def config_node(_: dict) -> dict:
     """Create initial State with config + run metadata. Fails fast if invalid."""
     args = build_arg_parser().parse_args()
+    log_sample = parse_sample_spec(
+        args.log_sample if args.log_sample is not None else os.getenv("LOG_SAMPLE"))
+    configure_logging(fmt=args.log_format, sample=log_sample)
 
     run_date = datetime.now().strftime("%Y%m%d")
     timestamp = datetime.now().strftime("%d/%m/%y %H:%M")
@@ -57,6 +92,20 @@ def config_node(_: dict) -> dict:
         headless=args.headless,
         retries_per_url=args.retries_per_url,
         nav_timeout_sec=args.nav_timeout,
+        nav_strategy=args.nav_strategy,
+        workers=args.workers,
+        canary_size=args.canary_size,
+        canary_max_failure=args.canary_max_failure,
+        canary_action=args.canary_action,
+        dead_after_runs=args.dead_after_runs,
+        dead_recheck_hours=args.dead_recheck_hours,
+        write_back=args.write_back,
+        schedule_every_min=args.schedule_every,
+        cycle_budget_sec=args.cycle_budget,
+        held_refresh_min=args.held_refresh,
+        watch_refresh_min=args.watch_refresh,
+        log_format=args.log_format,
+        log_sample=log_sample,
     )
     meta = RunMeta(run_id=run_id, run_date=run_date, timestamp=timestamp)
     st = State(meta=meta, config=cfg)
@@ -71,5 +120,11 @@ def config_node(_: dict) -> dict:
         "headless": cfg.headless,
         "retries_per_url": cfg.retries_per_url,
         "nav_timeout": cfg.nav_timeout_sec,
+        "nav_strategy": cfg.nav_strategy,
+        "workers": cfg.workers,
+        "canary_size": cfg.canary_size,
+        "write_back": cfg.write_back,
+        "schedule_every_min": cfg.schedule_every_min,
+        "cycle_budget_sec": cfg.cycle_budget_sec,
     }})
     return {"state": st.model_dump()}
@@ -0,0 +1,160 @@
+"""Delta outputs: only rows that are new, changed or removed since the previous run.
+
+The previous run is a snapshot Parquet (``latest_funds.parquet`` / ``latest_sectors.parquet``)
+that this node refreshes after every run, so several runs on the same day still diff
+against each other. Rows are compared by a per-row hash of the value columns
+(``date`` excluded), joined on ``fundKey`` for funds and ``sectorName`` for sectors.
+
+Funds that were not scraped this run (failed, deferred by ``--cycle-budget`` or skipped
+as dead) are neither reported as removed nor dropped from the snapshot: their previous
+rows are carried into the new one.
+"""
+from __future__ import annotations
+from typing import Dict, Any, Optional
+import glob
+import os
+import pandas as pd
+from ..state import State
+from ..utils.logging_setup import setup_logger
+from ..utils.fund_identity import fund_key
+from .normalize_write_node import _to_df_funds, _to_df_sectors, _save_pair
+
+logger = setup_logger()
+
+CHANGE_COLUMN = "change"  # added | changed | removed
+IGNORED_COLUMNS = {"date"}
+
+
+def _canon(s: pd.Series) -> pd.Series:
+    """Dtype-independent string form so 5, 5.0 and '5' hash the same across runs."""
+    num = pd.to_numeric(s, errors="coerce")
+    out = s.astype(str)
+    if num.notna().any():
+        out = out.where(num.isna(), num.astype(float).round(6).astype(str))
+    return out.where(s.notna(), "")
+
+
+def row_hashes(df: pd.DataFrame, key: str) -> pd.Series:
+    cols = [c for c in df.columns if c != key and c not in IGNORED_COLUMNS]
+    canon = pd.DataFrame({c: _canon(df[c]) for c in cols}, index=df.index)
+    return pd.util.hash_pandas_object(canon, index=False)
+
+
+def compute_delta(current: pd.DataFrame, previous: Optional[pd.DataFrame], key: str,
+                  keep_keys: Optional[set] = None) -> pd.DataFrame:
+    """Rows of ``current`` that are added/changed, plus rows of ``previous`` that are gone.
+    Keys in ``keep_keys`` (e.g. URLs that failed this run) are never reported as removed.
+    """
+    columns = list(current.columns) + [CHANGE_COLUMN]
+    cur = current[current[key].notna()].drop_duplicates(subset=key, keep="first")
+    if previous is None or previous.empty:
+        return cur.assign(**{CHANGE_COLUMN: "added"})[columns]
+    prev = previous.reindex(columns=current.columns)
+    prev = prev[prev[key].notna()].drop_duplicates(subset=key, keep="first")
+
+    joined = pd.merge(
+        pd.DataFrame({key: cur[key].values, "_h_cur": row_hashes(cur, key).values}),
+        pd.DataFrame({key: prev[key].values, "_h_prev": row_hashes(prev, key).values}),
+        on=key, how="outer", indicator=True)
+    added = joined.loc[joined["_merge"] == "left_only", key]
+    changed = joined.loc[(joined["_merge"] == "both") & (
+        joined["_h_cur"] != joined["_h_prev"]), key]
+    removed = joined.loc[joined["_merge"] == "right_only", key]
+    if keep_keys:
+        removed = removed[~removed.isin(keep_keys)]
+
+    parts = [
+        cur[cur[key].isin(added)].assign(**{CHANGE_COLUMN: "added"}),
+        cur[cur[key].isin(changed)].assign(**{CHANGE_COLUMN: "changed"}),
+        prev[prev[key].isin(removed)].assign(**{CHANGE_COLUMN: "removed"}),
+    ]
+    parts = [p for p in parts if not p.empty]
+    if not parts:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(parts, ignore_index=True)[columns]
+
+
+def _previous_snapshot(outdir: str, kind: str, date: str) -> Optional[pd.DataFrame]:
+    """Snapshot from the last run; on first use fall back to the newest older dated Parquet."""
+    path = os.path.join(outdir, f"latest_{kind}.parquet")
+    if not os.path.exists(path):
+        dated = sorted(p for p in glob.glob(os.path.join(outdir, f"*_{kind}.parquet"))
+                       if os.path.basename(p) < f"{date}_{kind}.parquet")
+        if not dated:
+            return None
+        path = dated[-1]
+    try:
+        prev = pd.read_parquet(path)
+        if kind == "funds" and "fundKey" not in prev.columns and "url" in prev.columns:
+            # snapshots written before fund keys existed
+            prev["fundKey"] = prev["url"].map(lambda u: fund_key(u) if isinstance(u, str) else None)
+        return prev
+    except Exception as e:
+        logger.warning("delta_baseline_unreadable", extra={
+            "kv": {"step": "delta_node", "path": path, "error": str(e)[:200]}})
+        return None
+
+
+def _carry_unscraped(current: pd.DataFrame, previous: Optional[pd.DataFrame], key: str,
+                     keep_keys: Optional[set]) -> pd.DataFrame:
+    """``current`` plus the previous rows of ``keep_keys`` that have no current row."""
+    if not keep_keys or previous is None or previous.empty:
+        return current
+    prev = previous.reindex(columns=current.columns)
+    carried = prev[prev[key].isin(keep_keys) & ~prev[key].isin(current[key])]
+    if carried.empty:
+        return current
+    if current.empty:
+        return carried.reset_index(drop=True)
+    return pd.concat([current, carried], ignore_index=True)
+
+
+def _write_snapshot(df: pd.DataFrame, outdir: str, kind: str) -> None:
+    path = os.path.join(outdir, f"latest_{kind}.parquet")
+    tmp = path + ".tmp"
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def delta_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    st = State.model_validate(state["state"])  # hydrate
+
+    date = st.meta.run_date
+    outdir = st.config.output_dir
+    # no row this run, but not gone either
+    unscraped = {fund_key(u) for u in st.failed_urls} | set(st.unscraped_keys)
+
+    funds_df = _to_df_funds(st.fund_rows_raw)
+    sectors_df = _to_df_sectors(st.sector_rows_raw)
+
+    counts: Dict[str, int] = {}
+    try:
+        for kind, df, key, keep in (("funds", funds_df, "fundKey", unscraped),
+                                    ("sectors", sectors_df, "sectorName", None)):
+            if kind in st.degraded:
+                continue  # not scraped this run: nothing was removed
+            prev = _previous_snapshot(outdir, kind, date)
+            delta = compute_delta(df, prev, key, keep)
+            csv_path, _ = _save_pair(delta, os.path.join(outdir, f"{date}_{kind}_delta"))
+            if kind == "funds":
+                st.funds_delta_path = csv_path
+            else:
+                st.sectors_delta_path = csv_path
+            snapshot = _carry_unscraped(df, prev, key, keep)
+            # an empty scrape (e.g. sectors page down) must not wipe the baseline
+            if not snapshot.empty:
+                _write_snapshot(snapshot, outdir, kind)
+            counts.update({f"{kind}_{c}": int((delta[CHANGE_COLUMN] == c).sum())
+                           for c in ("added", "changed", "removed")})
+    except Exception as e:
+        logger.error("delta_failed", extra={
+            "kv": {"step": "delta_node", "error": str(e)[:200]}})
+    else:
+        logger.info("delta_written", extra={"kv": {
+            "step": "delta_node",
+            "funds_delta": st.funds_delta_path,
+            "sectors_delta": st.sectors_delta_path,
+            **counts,
+        }})
+    st.stats.update({"delta": counts})
+    return {"state": st.model_dump()}
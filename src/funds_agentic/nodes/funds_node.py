@@ -1,27 +1,46 @@
 from __future__ import annotations
-from typing import Dict, Any, List
-from tenacity import retry, stop_after_attempt, wait_exponential
+from typing import Dict, Any, List, Optional, Tuple
+import time
+from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_not_exception_type
 from playwright.sync_api import TimeoutError as PWTimeout
 from ..state import State
-from ..utils.logging_setup import setup_logger
+from ..utils.logging_setup import setup_logger, configure_logging
 from ..selectors import (
-    TABLE_GENERIC, FUND_NAME, FE_RISK, UNIT_INFO_TABLE, SECTOR_LINK_TEXT
+    TABLE_GENERIC, FUND_NAME, FE_RISK, UNIT_INFO_TABLE, SECTOR_LINK_TEXT,
+    FUND_READY_SELECTORS, DEAD_FUND_PATH_PREFIXES,
 )
-from ..utils.parsing import extract_perf_from_table_text, find_quartile_from_text, clean_price_token
+from ..utils.navigation import open_page, PermanentNavigationError
+from ..utils.negative_cache import NegativeCache, classify_failure, PERMANENT
+from ..utils.process_pool import ProcessPool, default_workers
+from ..utils.scheduling import ScheduleBook
+from ..utils.fund_identity import FundIndex, canonical_url, fund_key
+from ..utils.parsing import parse_fund_figures
+from .browser_node import _launch_context, shutdown_browser
+from .normalize_write_node import new_fund_rows
 
 logger = setup_logger()
 
 
-@retry(stop=stop_after_attempt(2), wait=wait_exponential(multiplier=0.5, max=8))
-def _open_page(ctx, url: str, timeout_ms: int):
-    page = ctx.new_page()
-    page.goto(url, timeout=timeout_ms * 1000)
-    return page
+@retry(stop=stop_after_attempt(2), wait=wait_exponential(multiplier=0.5, max=8),
+       retry=retry_if_not_exception_type(PermanentNavigationError))
+def _open_page(ctx, url: str, timeout_ms: int, nav_strategy: str = "load"):
+    return open_page(ctx, url, timeout_ms, nav_strategy, FUND_READY_SELECTORS,
+                     DEAD_FUND_PATH_PREFIXES)
 
 
-def _scrape_one(ctx, url: str, timestamp: str, hold: bool, holding_pct, timeout_sec: int) -> Dict[str, Any] | None:
-    page = _open_page(ctx, url, timeout_sec)
+def _scrape_one(ctx, url: str, timestamp: str, hold: bool, holding_pct, timeout_sec: int,
+                nav_strategy: str = "load") -> Dict[str, Any] | None:
+    page = _open_page(ctx, url, timeout_sec, nav_strategy)
+    try:
+        return _extract_fund(page, url, timestamp, hold, holding_pct)
+    finally:
+        try:
+            page.close()
+        except Exception:
+            pass
+
 
+def _extract_fund(page, url: str, timestamp: str, hold: bool, holding_pct) -> Dict[str, Any]:
     # Find the performance table by scanning generic tables and picking one with header tokens
     tables = page.locator(TABLE_GENERIC)
     target_text = None
@@ -34,9 +53,6 @@ def _scrape_one(ctx, url: str, timestamp: str, hold: bool, holding_pct, timeout_
     if not target_text:
         raise RuntimeError("performance_table_not_found")
 
-    perf = extract_perf_from_table_text(target_text)
-    quartile = find_quartile_from_text(target_text)
-
     # Fund name (first occurrence is fund; second often sector)
     names = page.locator(FUND_NAME)
     fund_name = names.nth(0).inner_text(
@@ -52,6 +68,8 @@ def _scrape_one(ctx, url: str, timestamp: str, hold: bool, holding_pct, timeout_
             sector_url = a.first.get_attribute("href")
         if names.count() > 1:
             sector = names.nth(1).inner_text().strip()
+        if sector_url:
+            sector_url = canonical_url(sector_url)
     except Exception:
         pass
 
@@ -65,88 +83,237 @@ def _scrape_one(ctx, url: str, timestamp: str, hold: bool, holding_pct, timeout_
         pass
 
     # Price best-effort from unit info table
-    price = None
+    unit_text = None
     try:
         unit_table = page.locator(UNIT_INFO_TABLE)
         if unit_table.count() > 0:
-            # look for a number-like token in text
-            tokens = unit_table.first.inner_text().replace("%", "").split()
-            for t in tokens:
-                if any(ch.isdigit() for ch in t):
-                    price = clean_price_token(t)
-                    break
+            unit_text = unit_table.first.inner_text()
     except Exception:
         pass
 
+    figures = parse_fund_figures(target_text, unit_text)
+
     row = {
         "date": timestamp,
         "fundName": fund_name,
-        "Quartile": quartile,
+        "Quartile": figures["Quartile"],
         "FERisk": fe_risk,
-        "3m": perf.get("3m"),
-        "6m": perf.get("6m"),
-        "1y": perf.get("1y"),
-        "3y": perf.get("3y"),
-        "5y": perf.get("5y"),
+        "3m": figures["3m"],
+        "6m": figures["6m"],
+        "1y": figures["1y"],
+        "3y": figures["3y"],
+        "5y": figures["5y"],
         "url": url,
         "Hold": hold,
         "Holding%": holding_pct,
         "Sector": sector,
         "SectorUrl": sector_url,
-        "price": price,
+        "price": figures["price"],
+        "fundKey": fund_key(url),
     }
     return row
 
 
+def _dead_record(url: str, key: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "url": url,
+        "fundKey": key,
+        "reason": entry.get("reason"),
+        "since": time.strftime("%Y-%m-%d", time.localtime(entry.get("since", 0))),
+        "nextCheck": time.strftime("%Y-%m-%d %H:%M", time.localtime(entry.get("next_check", 0))),
+    }
+
+
+def _scrape_with_retries(ctx, rec: Dict[str, Any], timestamp: str, timeout_sec: int,
+                        nav_strategy: str, attempts: int) -> Tuple[Optional[Dict[str, Any]], Optional[Exception]]:
+    """-> (row, None) on success or (None, last error) once ``attempts`` are used up."""
+    url = rec["url"]
+    last_error: Exception | None = None
+    for attempt in range(1, attempts + 1):
+        try:
+            row = _scrape_one(
+                ctx=ctx,
+                url=rec.get("canonical_url") or url,
+                timestamp=timestamp,
+                hold=rec.get("hold", False),
+                holding_pct=rec.get("holding_pct"),
+                timeout_sec=timeout_sec,
+                nav_strategy=nav_strategy,
+            )
+            row["url"] = url  # report the URL as listed in the input
+            logger.info("fund_scraped", extra={
+                "kv": {"step": "funds_node", "url": url, "status": "ok", "attempt": attempt}})
+            return row, None
+
+        except Exception as e:
+            last_error = e
+            permanent = isinstance(e, PermanentNavigationError)
+            if attempt < attempts and not permanent:
+                # Not the last attempt, log and retry
+                logger.warning("fund_retry", extra={
+                    "kv": {"step": "funds_node", "url": url, "attempt": attempt,
+                           "max_retries": attempts, "reason": str(e)[:100]}})
+            else:
+                # Last attempt failed (or retrying cannot help)
+                logger.warning("fund_failed", extra={
+                    "kv": {"step": "funds_node", "url": url, "status": "failed",
+                           "attempts": attempt, "reason": str(e)[:100]}})
+                break
+    return None, last_error
+
+
+# --- process engine (--workers N): each worker process runs its own browser ---
+
+def _pool_init(cfg: Dict[str, Any]):
+    configure_logging(fmt=cfg["log_format"], sample=cfg["log_sample"])
+    return _launch_context(cfg["headless"])
+
+
+def _pool_scrape(ctx, cfg: Dict[str, Any], task: Tuple[Dict[str, Any], str, int]):
+    rec, _, attempts = task
+    row, err = _scrape_with_retries(ctx, rec, cfg["timestamp"], cfg["nav_timeout_sec"],
+                                    cfg["nav_strategy"], attempts)
+    if err is None:
+        return row, None
+    # tenacity/Playwright errors do not always survive pickling; keep what the
+    # negative cache classifies on
+    reason, kind = classify_failure(err)
+    return None, PermanentNavigationError(reason) if kind == PERMANENT else RuntimeError(reason)
+
+
+def _pool_close() -> None:
+    shutdown_browser()
+
+
+def _task_timeout_sec(timeout_sec: int, attempts: int) -> float:
+    # per attempt: two page opens (tenacity) plus extraction and back-off slack
+    return attempts * (2 * timeout_sec + 30) + 30
+
+
 def funds_node(state: Dict[str, Any]) -> Dict[str, Any]:
     st = State.model_validate(state["state"])  # hydrate
+    if "funds" in st.degraded:
+        logger.warning("funds_skipped", extra={
+            "kv": {"step": "funds_node", "reason": "canary", "urls": len(st.fund_rows)}})
+        return {"state": st.model_dump()}
     ctx = st.browser_ctx
     max_retries = st.config.retries_per_url
+    budget = st.config.cycle_budget_sec
+    workers = st.config.workers or default_workers()
+    # scheduler mode: remember successes and carry forward rows we had no time for
+    book = ScheduleBook.load(
+        st.config.output_dir) if st.config.schedule_every_min else None
+    index = FundIndex.load(st.config.output_dir)
+    dead_cache = NegativeCache.load(st.config.output_dir)
 
-    out: List[dict] = []
+    out = new_fund_rows()
     failed: List[str] = []
+    dead: List[dict] = []
+    deferred: List[dict] = []
+    unscraped: List[str] = []  # fund keys with no row this run that are not failures
+    started = time.monotonic()
 
+    tasks: List[Tuple[Dict[str, Any], str, int]] = []
     for rec in st.fund_rows:
         url = rec["url"]
-        success = False
-
-        # Retry loop for each URL
-        for attempt in range(1, max_retries + 1):
-            try:
-                row = _scrape_one(
-                    ctx=ctx,
-                    url=url,
-                    timestamp=st.meta.timestamp,
-                    hold=rec.get("hold", False),
-                    holding_pct=rec.get("holding_pct"),
-                    timeout_sec=st.config.nav_timeout_sec,
-                )
-                out.append(row)
-                success = True
-                logger.info("fund_scraped", extra={
-                    "kv": {"step": "funds_node", "url": url, "status": "ok", "attempt": attempt}})
-                break  # Success, exit retry loop
-
-            except Exception as e:
-                if attempt < max_retries:
-                    # Not the last attempt, log and retry
-                    logger.warning("fund_retry", extra={
-                        "kv": {"step": "funds_node", "url": url, "attempt": attempt,
-                               "max_retries": max_retries, "reason": str(e)[:100]}})
-                else:
-                    # Last attempt failed
-                    logger.warning("fund_failed", extra={
-                        "kv": {"step": "funds_node", "url": url, "status": "failed",
-                               "attempts": max_retries, "reason": str(e)[:100]}})
-
-        if not success:
+        key = rec.get("fund_key") or fund_key(url)
+        entry = dead_cache.skip(key)
+        if entry is not None:
+            dead.append(_dead_record(url, key, entry))
+            unscraped.append(key)
+            logger.info("fund_skipped_dead", extra={"kv": {
+                "step": "funds_node", "url": url, "reason": entry.get("reason")}})
+            continue
+        # a dead fund due for re-check gets a single attempt
+        tasks.append((rec, key, 1 if dead_cache.is_dead(key) else max_retries))
+
+    def finish(task, row: Optional[Dict[str, Any]], error: Optional[Exception]) -> None:
+        rec, key, _ = task
+        url = rec["url"]
+        if row is not None:
+            out.append(row)
+            index.update(row["fundKey"], row["url"],
+                         row.get("fundName"), st.meta.run_date)
+            if book is not None:
+                book.mark(url, row)
+            if dead_cache.record_success(key):
+                logger.info("fund_revived", extra={
+                    "kv": {"step": "funds_node", "url": url}})
+            return
+        entry = dead_cache.record_failure(
+            key, url, error, st.config.dead_after_runs, st.config.dead_recheck_hours)
+        if entry.get("dead"):
+            dead.append(_dead_record(url, key, entry))
+        else:
             failed.append(url)
 
-    st.fund_rows_raw = out
-    st.failed_urls = failed
+    if workers > 1 and len(tasks) > 1:
+        pool = ProcessPool(
+            workers, _pool_init, _pool_scrape, _pool_close,
+            cfg={"headless": st.config.headless, "timestamp": st.meta.timestamp,
+                 "nav_timeout_sec": st.config.nav_timeout_sec,
+                 "nav_strategy": st.config.nav_strategy,
+                 "log_format": st.config.log_format, "log_sample": st.config.log_sample},
+            task_timeout_sec=_task_timeout_sec(st.config.nav_timeout_sec, max_retries))
+
+        def on_result(task, result, error):
+            if error is not None:  # the pool gave up on it (worker crashed/hung)
+                logger.warning("fund_failed", extra={"kv": {
+                    "step": "funds_node", "url": task[0]["url"], "status": "failed",
+                    "reason": str(error)}})
+                finish(task, None, error)
+            else:
+                finish(task, *result)
+
+        skipped = pool.run(tasks, on_result,
+                           deadline=started + budget if budget else None)
+        deferred.extend(task[0] for task in skipped)
+        # results stream in completion order; keep the input order in the outputs
+        pos = {rec["url"]: i for i, rec in enumerate(st.fund_rows)}
+        out = out.take(sorted(range(len(out)), key=lambda i: pos.get(out.value("url", i), 0)))
+        failed.sort(key=lambda u: pos.get(u, 0))
+        st.stats.update({"workers": min(workers, len(tasks)),
+                         "worker_restarts": pool.restarts})
+    else:
+        for task in tasks:
+            if budget and time.monotonic() - started > budget:
+                deferred.append(task[0])
+                continue
+            rec, _, attempts = task
+            finish(task, *_scrape_with_retries(ctx, rec, st.meta.timestamp, st.config.nav_timeout_sec,
+                                               st.config.nav_strategy, attempts))
+
     st.stats.update({
         "scraped_ok": len(out),
         "failed": len(failed),
-        "failure_rate": (len(failed) / max(1, len(out) + len(failed)))
+        "failure_rate": (len(failed) / max(1, len(out) + len(failed))),
+        "deferred": len(deferred),
+        "dead": len(dead),
     })
+    if deferred:
+        logger.info("budget_exhausted", extra={"kv": {
+            "step": "funds_node", "budget_sec": budget, "deferred": len(deferred)}})
+
+    if book is not None:
+        carried = 0
+        for rec in deferred:
+            row = book.last_row(rec["url"])
+            if row:
+                out.append(dict(row, Hold=rec.get("hold", False),
+                                **{"Holding%": rec.get("holding_pct")}))
+                carried += 1
+        book.save()
+        st.stats["carried_forward"] = carried
+
+    for store in (index, dead_cache):
+        try:
+            store.save()
+        except OSError as e:
+            logger.warning("cache_save_failed", extra={
+                "kv": {"step": "funds_node", "path": store.path, "error": str(e)[:200]}})
+
+    st.fund_rows_raw = out
+    st.failed_urls = failed
+    st.dead_urls = dead
+    st.unscraped_keys = unscraped + [rec.get("fund_key") or fund_key(rec["url"]) for rec in deferred]
     return {"state": st.model_dump()}
@@ -1,9 +1,11 @@
 from __future__ import annotations
 from typing import Dict, Any, List
+import time
 from ..state import State
 from ..utils.logging_setup import setup_logger
 from ..utils.io_excel import load_excel
 from ..utils.io_gsheet import load_gsheet
+from ..utils.scheduling import ScheduleBook, prioritize
 
 logger = setup_logger()
 
@@ -20,9 +22,15 @@ def input_node(state: Dict[str, Any]) -> Dict[str, Any]:
         rows = load_gsheet(cfg.gsheet_url, cfg.gdrive_id,
                            cfg.sheet, cfg.row_start, overrides)
 
+    if cfg.schedule_every_min:
+        # scheduler mode: most urgent (held, heavy, stale) funds first
+        rows = prioritize(rows, ScheduleBook.load(cfg.output_dir), time.time(),
+                          cfg.held_refresh_min, cfg.watch_refresh_min)
+
     logger.info("Input loaded", extra={"kv": {
         "step": "input_node",
         "rows": len(rows),
+        "prioritized": bool(cfg.schedule_every_min),
     }})
 
     st.fund_rows = rows
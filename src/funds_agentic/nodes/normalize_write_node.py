@@ -1,39 +1,53 @@
 from __future__ import annotations
-from typing import Dict, Any, List
+from typing import Dict, Any
 import os
 import pandas as pd
 from ..state import State
 from ..utils.logging_setup import setup_logger
+from ..utils.columnar import ColumnarRows, frame_of, FLOAT, INT, BOOL, STR
+from .relative_perf_node import EXCESS_COLUMNS, PCTILE_COLUMNS
 
 logger = setup_logger()
 
-FUNDS_COLUMNS = [
-    "date", "fundName", "Quartile", "FERisk",
-    "3m", "6m", "1y", "3y", "5y",
-    "url", "Hold", "Holding%",
-    "Sector", "SectorUrl", "price",
-]
+# column -> storage kind for ColumnarRows; key order is the output column order
+FUNDS_SCHEMA = {
+    "date": STR, "fundName": STR, "Quartile": INT, "FERisk": INT,
+    "3m": FLOAT, "6m": FLOAT, "1y": FLOAT, "3y": FLOAT, "5y": FLOAT,
+    "url": STR, "Hold": BOOL, "Holding%": FLOAT,
+    "Sector": STR, "SectorUrl": STR, "price": STR,
+    "fundKey": STR,
+    **{c: FLOAT for c in EXCESS_COLUMNS + PCTILE_COLUMNS},
+}
+FUNDS_COLUMNS = list(FUNDS_SCHEMA)
 
-SECTORS_COLUMNS = [
-    "date", "sectorName", "1m", "3m", "6m", "1y", "3y", "5y"
-]
+SECTORS_SCHEMA = {
+    "date": STR, "sectorName": STR,
+    "1m": FLOAT, "3m": FLOAT, "6m": FLOAT, "1y": FLOAT, "3y": FLOAT, "5y": FLOAT,
+}
+SECTORS_COLUMNS = list(SECTORS_SCHEMA)
 
+# repeated on (nearly) every row: store each distinct value once
+INTERNED_COLUMNS = ("date", "Sector", "SectorUrl")
 
-def _to_df_funds(rows: List[dict]) -> pd.DataFrame:
-    df = pd.DataFrame(rows)
-    # Ensure all columns exist and in order
-    for c in FUNDS_COLUMNS:
-        if c not in df.columns:
-            df[c] = None
-    return df[FUNDS_COLUMNS]
 
+DEAD_URLS_COLUMNS = ["url", "fundKey", "reason", "since", "nextCheck"]
 
-def _to_df_sectors(rows: List[dict]) -> pd.DataFrame:
-    df = pd.DataFrame(rows)
-    for c in SECTORS_COLUMNS:
-        if c not in df.columns:
-            df[c] = None
-    return df[SECTORS_COLUMNS]
+
+def new_fund_rows() -> ColumnarRows:
+    return ColumnarRows(FUNDS_SCHEMA, INTERNED_COLUMNS)
+
+
+def new_sector_rows() -> ColumnarRows:
+    return ColumnarRows(SECTORS_SCHEMA, INTERNED_COLUMNS)
+
+
+def _to_df_funds(rows) -> pd.DataFrame:
+    """``rows``: ColumnarRows (from funds_node) or a list of row dicts."""
+    return frame_of(rows, FUNDS_SCHEMA)
+
+
+def _to_df_sectors(rows) -> pd.DataFrame:
+    return frame_of(rows, SECTORS_SCHEMA)
 
 
 def _save_pair(df: pd.DataFrame, basepath: str) -> tuple[str, str]:
@@ -57,8 +71,11 @@ def normalize_write_node(state: Dict[str, Any]) -> Dict[str, Any]:
     sectors_base = os.path.join(outdir, f"{date}_sectors")
 
     try:
-        funds_csv, funds_parquet = _save_pair(funds_df, funds_base)
-        sectors_csv, sectors_parquet = _save_pair(sectors_df, sectors_base)
+        # parts skipped by the canary keep today's earlier files (if any) intact
+        funds_csv, funds_parquet = (None, None) if "funds" in st.degraded \
+            else _save_pair(funds_df, funds_base)
+        sectors_csv, sectors_parquet = (None, None) if "sectors" in st.degraded \
+            else _save_pair(sectors_df, sectors_base)
     except Exception as e:
         # fallback for funds CSV only (parquet likely also fails if perms issue)
         fallback_csv = os.path.join(outdir, f"Local_{date}_funds.csv")
@@ -80,4 +97,13 @@ def normalize_write_node(state: Dict[str, Any]) -> Dict[str, Any]:
             "sectors_csv": sectors_csv,
         }})
 
+    if st.dead_urls:
+        dead_csv = os.path.join(outdir, f"{date}_dead_urls.csv")
+        try:
+            pd.DataFrame(st.dead_urls, columns=DEAD_URLS_COLUMNS).to_csv(dead_csv, index=False)
+            st.dead_urls_csv_path = dead_csv
+        except Exception as e:
+            logger.error("write_failed", extra={
+                "kv": {"step": "normalize_write_node", "path": dead_csv, "error": str(e)}})
+
     return {"state": st.model_dump()}
@@ -0,0 +1,88 @@
+"""Fund-vs-sector relative performance, computed with vectorized pandas/NumPy.
+
+Sector rows are indexed by a normalized sector name (a hashed pandas Index), fund rows are
+looked up against it in one ``reindex``, and for each period we emit:
+- ``<p>VsSector``: fund return minus sector average return (percentage points)
+- ``<p>SectorPctile``: percentile rank of the fund among our funds in the same sector
+  (1.0 = best)
+Fund sector names with no match in the sectors table are reported, not guessed.
+"""
+from __future__ import annotations
+from typing import Dict, Any, List
+import time
+import numpy as np
+import pandas as pd
+from ..state import State
+from ..utils.logging_setup import setup_logger
+from ..utils.columnar import ColumnarRows
+
+logger = setup_logger()
+
+PERIODS = ["3m", "6m", "1y", "3y", "5y"]
+EXCESS_COLUMNS = [f"{p}VsSector" for p in PERIODS]
+PCTILE_COLUMNS = [f"{p}SectorPctile" for p in PERIODS]
+
+
+def normalize_sector_names(names: pd.Series) -> pd.Series:
+    return (names.astype("string").str.lower()
+            .str.replace("&", " and ", regex=False)
+            .str.replace(r"[^a-z0-9]+", " ", regex=True)
+            .str.strip())
+
+
+def relative_performance(funds: pd.DataFrame, sectors: pd.DataFrame) -> tuple[pd.DataFrame, List[str]]:
+    """Return (frame of EXCESS_COLUMNS + PCTILE_COLUMNS aligned to ``funds``, unmatched names)."""
+    out = pd.DataFrame(index=funds.index, columns=EXCESS_COLUMNS + PCTILE_COLUMNS, dtype="float64")
+    if funds.empty or "Sector" not in funds.columns:
+        return out, []
+
+    fund_sector = normalize_sector_names(funds["Sector"])
+    fund_vals = funds.reindex(columns=PERIODS).apply(pd.to_numeric, errors="coerce")
+
+    if sectors.empty or "sectorName" not in sectors.columns:
+        sector_vals = pd.DataFrame(np.nan, index=funds.index, columns=PERIODS)
+        matched = pd.Series(False, index=funds.index)
+    else:
+        table = sectors.reindex(columns=PERIODS).apply(pd.to_numeric, errors="coerce")
+        table.index = pd.Index(normalize_sector_names(sectors["sectorName"]))
+        table = table[~table.index.duplicated(keep="first") & table.index.notna()]
+        sector_vals = table.reindex(fund_sector.to_numpy())
+        sector_vals.index = funds.index
+        matched = pd.Series(table.index.get_indexer(fund_sector.to_numpy()) >= 0, index=funds.index)
+
+    out[EXCESS_COLUMNS] = (fund_vals.to_numpy() - sector_vals.to_numpy()).round(4)
+    has_sector = fund_sector.notna() & (fund_sector != "")
+    ranks = fund_vals[has_sector].groupby(fund_sector[has_sector]).rank(pct=True, method="average")
+    out.loc[ranks.index, PCTILE_COLUMNS] = ranks.to_numpy().round(4)
+
+    unmatched = sorted(funds.loc[has_sector & ~matched, "Sector"].dropna().astype(str).unique())
+    return out, unmatched
+
+
+def _frame(rows) -> pd.DataFrame:
+    return rows.to_pandas() if isinstance(rows, ColumnarRows) else pd.DataFrame(rows)
+
+
+def relative_perf_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    st = State.model_validate(state["state"])  # hydrate
+    if not st.fund_rows_raw:
+        return {"state": st.model_dump()}
+
+    t0 = time.perf_counter()
+    funds = _frame(st.fund_rows_raw)
+    sectors = _frame(st.sector_rows_raw)
+    rel, unmatched = relative_performance(funds, sectors)
+    for c in rel.columns:  # whole columns straight into the typed arrays
+        st.fund_rows_raw.set_column(c, rel[c].to_numpy(dtype="float64"))
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+
+    if "sectors" in st.degraded:
+        unmatched = []  # no sectors table this run (canary); nothing to report
+    st.stats.update({"unmatched_sectors": unmatched})
+    if unmatched:
+        logger.warning("sectors_unmatched", extra={"kv": {
+            "step": "relative_perf_node", "count": len(unmatched), "names": unmatched[:20]}})
+    logger.info("relative_perf_done", extra={"kv": {
+        "step": "relative_perf_node", "funds": len(funds), "sectors": len(sectors),
+        "elapsed_ms": round(elapsed_ms, 1)}})
+    return {"state": st.model_dump()}
@@ -5,14 +5,17 @@ from playwright.sync_api import TimeoutError as PWTimeout
 from ..state import State
 from ..utils.logging_setup import setup_logger
 from ..selectors import SECTORS_URL, SECTORS_TABLE_CONTAINER, SECTORS_HEADER_TOKEN, PAGINATION_BUTTONS
+from ..utils.navigation import open_page
+from .normalize_write_node import new_sector_rows
 
 logger = setup_logger()
 
 
 @retry(stop=stop_after_attempt(2), wait=wait_exponential(multiplier=0.5, max=8))
 def _load_page(ctx, url: str, timeout_ms: int):
-    page = ctx.new_page()
-    page.goto(url, timeout=timeout_ms * 1000)
+    # always the full "load": the T&C modal and pagination need the site's scripts, so
+    # --nav-strategy (which stops the page load early) only applies to fund factsheets
+    page = open_page(ctx, url, timeout_ms)
     
     # Check if T&C modal appeared on this new page and dismiss it
     try:
@@ -72,6 +75,10 @@ def _float_or_none(s: str):
 
 def sectors_node(state: Dict[str, Any]) -> Dict[str, Any]:
     st = State.model_validate(state["state"])  # hydrate
+    if "sectors" in st.degraded:
+        logger.warning("sectors_skipped", extra={
+            "kv": {"step": "sectors_node", "reason": "canary"}})
+        return {"state": st.model_dump()}
     ctx = st.browser_ctx
     page = _load_page(ctx, SECTORS_URL, st.config.nav_timeout_sec)
 
@@ -128,7 +135,6 @@ def sectors_node(state: Dict[str, Any]) -> Dict[str, Any]:
                     "kv": {"step": "sectors_node", "page": next_page}})
                 break
             
-            print(f"Page {next_page}: extracted {len(new_rows)} rows")
             all_rows.extend(new_rows)
             current_page = next_page
             logger.info("Pagination success", extra={
@@ -140,11 +146,11 @@ def sectors_node(state: Dict[str, Any]) -> Dict[str, Any]:
             break
 
     # Attach timestamp to each row
-    print(f"Total sectors extracted: {len(all_rows)}")
     for r in all_rows:
         r["date"] = st.meta.timestamp
 
-    st.sector_rows_raw = all_rows
+    st.sector_rows_raw = new_sector_rows()
+    st.sector_rows_raw.extend(all_rows)
     logger.info("Sectors scraped", extra={
                 "kv": {"step": "sectors_node", "rows": len(all_rows)}})
     return {"state": st.model_dump()}
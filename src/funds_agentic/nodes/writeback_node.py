@@ -0,0 +1,41 @@
+from __future__ import annotations
+from typing import Dict, Any
+from ..state import State
+from ..utils.logging_setup import setup_logger
+from ..utils.io_gsheet import write_back_gsheet
+from ..utils.excel_sink import write_back_excel
+from .normalize_write_node import FUNDS_COLUMNS
+
+logger = setup_logger()
+
+
+def writeback_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Optionally write scraped results back into the tracking list (``--write-back``)."""
+    st = State.model_validate(state["state"])  # hydrate
+    cfg = st.config
+    if not cfg.write_back or not st.fund_rows_raw:
+        return {"state": st.model_dump()}
+
+    overrides = {"url": cfg.col_url,
+                 "hold": cfg.col_hold, "holding": cfg.col_holding}
+    try:
+        if cfg.input_path:
+            counts = write_back_excel(cfg.input_path, st.fund_rows_raw, cfg.sheet, cfg.row_start,
+                                      overrides, mode=cfg.write_back,
+                                      new_sheet_name=st.meta.run_date, columns=FUNDS_COLUMNS)
+            updated = counts.get("cells", 0)
+        elif cfg.write_back == "columns":
+            updated = write_back_gsheet(st.fund_rows_raw, cfg.gsheet_url, cfg.gdrive_id,
+                                        cfg.sheet, cfg.row_start, overrides)
+        else:
+            logger.warning("writeback_unsupported", extra={
+                "kv": {"step": "writeback_node", "mode": cfg.write_back}})
+            return {"state": st.model_dump()}
+    except Exception as e:
+        logger.error("writeback_failed", extra={
+            "kv": {"step": "writeback_node", "error": str(e)[:200]}})
+    else:
+        st.stats.update({"writeback_cells": updated})
+        logger.info("writeback_done", extra={
+            "kv": {"step": "writeback_node", "mode": cfg.write_back, "cells": updated}})
+    return {"state": st.model_dump()}
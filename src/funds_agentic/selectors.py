@@ -20,3 +20,22 @@ TABLE_GENERIC = ".fe-table"
 PERF_HEADER_TOKENS = ["3", "m", "6", "m"]
 UNIT_INFO_TABLE = ".fe-table.fe_table__head-left.table-all-left"
 SECTOR_LINK_TEXT = "(View sector)"
+# closed/merged funds redirect here instead of returning 404 (prefixes of the final URL path)
+DEAD_FUND_PATH_PREFIXES = ["/search"]
+
+# Canary pre-flight: fields that must parse on a healthy page (see canary_node)
+CANARY_FUND_FIELDS = ["fundName", "3m"]
+CANARY_SECTOR_FIELDS = ["sectorName", "3m"]
+
+# Fast navigation preconditions for fund factsheets: (selector, deadline_sec, required).
+# Required deadlines count from navigation start; optional ones from when the required
+# selectors are in the DOM. With --nav-strategy commit/domcontentloaded, navigation
+# returns once these are in the DOM and the rest of the page load (third-party scripts)
+# is stopped.
+PERF_TABLE_READY = TABLE_GENERIC + ":has-text('6 m')"
+FUND_READY_SELECTORS = [
+    (PERF_TABLE_READY, 15.0, True),
+    (FUND_NAME, 5.0, False),
+    (UNIT_INFO_TABLE, 3.0, False),
+    (FE_RISK, 2.0, False),
+]
@@ -20,6 +20,23 @@ class Config(BaseModel):
     headless: bool = True
     retries_per_url: int = 2
     nav_timeout_sec: int = 20
+    nav_strategy: str = "load"  # load | domcontentloaded | commit
+    workers: int = 1  # fund scraper processes (1 = in-process, 0 = one per CPU core)
+    dead_after_runs: int = 3  # performance_table_not_found runs in a row before "dead"
+    dead_recheck_hours: float = 24  # first re-check interval for dead funds (doubles)
+    # canary pre-flight: scrape a few funds + the first sectors page before the real run
+    canary_size: int = 3  # 0 = off
+    canary_max_failure: float = 0.5  # fund failure rate that trips the canary
+    canary_action: str = "degrade"  # degrade (skip the broken part) | abort
+    write_back: Optional[str] = None  # columns | sheet: write results back into the input
+    # scheduler mode (None = single run)
+    schedule_every_min: Optional[float] = None
+    cycle_budget_sec: Optional[int] = None
+    held_refresh_min: float = 60
+    watch_refresh_min: float = 360
+    log_format: str = "kv"  # kv | json
+    log_sample: Dict[str, float] = Field(
+        default_factory=dict)  # event -> keep ratio
 
 
 class RunMeta(BaseModel):
@@ -37,19 +54,30 @@ class State(BaseModel):
     # browser
     browser_ctx: Any | None = None  # Playwright BrowserContext
     consent_done: bool = False
+    degraded: List[str] = Field(
+        default_factory=list)  # "funds"/"sectors" skipped after a failed canary
 
     # data in-memory
     fund_rows: List[Dict[str, Any]] = Field(
         default_factory=list)  # ingested from Excel/Sheets
-    sector_rows_raw: List[Dict[str, Any]] = Field(default_factory=list)
-    fund_rows_raw: List[Dict[str, Any]] = Field(default_factory=list)
+    # scraped rows: utils.columnar.ColumnarRows (passed by reference, not re-dumped per node)
+    sector_rows_raw: Any = Field(default_factory=list)
+    fund_rows_raw: Any = Field(default_factory=list)
     failed_urls: List[str] = Field(default_factory=list)
+    dead_urls: List[Dict[str, Any]] = Field(
+        default_factory=list)  # skipped/marked via the negative cache
+    unscraped_keys: List[str] = Field(
+        default_factory=list)  # fund keys deferred by the cycle budget or skipped as dead
 
     # outputs
     funds_csv_path: Optional[str] = None
     sectors_csv_path: Optional[str] = None
     funds_parquet_path: Optional[str] = None
     sectors_parquet_path: Optional[str] = None
+    funds_delta_path: Optional[str] = None
+    sectors_delta_path: Optional[str] = None
+    dead_urls_csv_path: Optional[str] = None
+    canary_report_path: Optional[str] = None
 
     # stats / errors (for logging)
     stats: Dict[str, Any] = Field(default_factory=dict)
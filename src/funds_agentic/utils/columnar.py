@@ -0,0 +1,223 @@
+"""Columnar accumulator for scraped rows.
+
+Rows used to travel between nodes as lists of dicts: one dict plus boxed floats per fund,
+deep-copied by every ``model_dump``. ``ColumnarRows`` keeps one typed array per column
+instead (8 bytes per float/int, 1 per bool, one shared reference per repeated string)
+and is carried in State by reference, like the browser context.
+
+- append rows as dicts; read them back as ``Row`` views (``__slots__``, dict-like ``get``)
+- ``to_pandas`` / ``to_arrow`` hand NumPy views of the numeric buffers to pandas/Arrow
+  instead of building per-cell Python objects
+
+Column kinds: ``float`` (None -> NaN), ``int`` (nullable; int64 when complete, else
+float64 with NaN, as pandas would infer from dicts), ``bool`` (nullable; bool when
+complete, else object with None), ``str`` (any object; values of ``interned`` columns
+are shared so repeated dates/sectors cost one string).
+"""
+from __future__ import annotations
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence
+from array import array
+import math
+import numpy as np
+import pandas as pd
+
+FLOAT, INT, BOOL, STR = "float", "int", "bool", "str"
+_TYPECODES = {FLOAT: "d", INT: "q", BOOL: "b"}
+_NAN = float("nan")
+
+
+class Row:
+    """Read-only view of one row; supports ``row["col"]``, ``row.get`` and ``dict(row.items())``."""
+    __slots__ = ("_store", "_i")
+
+    def __init__(self, store: "ColumnarRows", i: int):
+        self._store = store
+        self._i = i
+
+    def __getitem__(self, column: str) -> Any:
+        if column not in self._store.schema:
+            raise KeyError(column)
+        return self._store.value(column, self._i)
+
+    def get(self, column: str, default: Any = None) -> Any:
+        if column not in self._store.schema:
+            return default
+        return self._store.value(column, self._i)
+
+    def keys(self) -> List[str]:
+        return list(self._store.schema)
+
+    def items(self) -> Iterator[tuple]:
+        return ((c, self._store.value(c, self._i)) for c in self._store.schema)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    def __repr__(self) -> str:
+        return f"Row({self.to_dict()!r})"
+
+
+class ColumnarRows:
+    def __init__(self, schema: Mapping[str, str], interned: Iterable[str] = ()):
+        self.schema: Dict[str, str] = dict(schema)
+        self._cols: Dict[str, Any] = {}
+        self._valid: Dict[str, bytearray] = {}  # INT and BOOL columns only
+        self._interned = {c: {} for c in interned}
+        self._len = 0
+        self._exported = False
+        for c, kind in self.schema.items():
+            self._cols[c] = array(_TYPECODES[kind]) if kind in _TYPECODES else []
+            if kind in (INT, BOOL):
+                self._valid[c] = bytearray()
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Mapping[str, Any]], schema: Mapping[str, str],
+                  interned: Iterable[str] = ()) -> "ColumnarRows":
+        store = cls(schema, interned)
+        store.extend(rows)
+        return store
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[Row]:
+        return (Row(self, i) for i in range(self._len))
+
+    def __getitem__(self, i: int) -> Row:
+        if not -self._len <= i < self._len:
+            raise IndexError(i)
+        return Row(self, i % self._len)
+
+    def _detach(self) -> None:
+        # arrays whose buffers were handed to NumPy cannot grow in place
+        for c, col in self._cols.items():
+            if isinstance(col, array):
+                self._cols[c] = array(col.typecode, col)
+        for c, valid in self._valid.items():
+            self._valid[c] = bytearray(valid)
+        self._exported = False
+
+    def append(self, row: Mapping[str, Any]) -> None:
+        # convert the whole row before touching any column, so a bad value cannot leave
+        # columns of unequal length; values that do not convert are stored as missing
+        values = []
+        valid = []
+        for c, kind in self.schema.items():
+            v = row.get(c)
+            if kind == FLOAT:
+                try:
+                    v = _NAN if v is None else float(v)
+                except (TypeError, ValueError):
+                    v = _NAN
+            elif kind == STR:
+                pool = self._interned.get(c)
+                if pool is not None and v is not None:
+                    v = pool.setdefault(v, v)
+            else:
+                ok = v is not None and not (isinstance(v, float) and math.isnan(v))
+                if ok:
+                    try:
+                        v = int(v) if kind == INT else bool(v)
+                    except (TypeError, ValueError, OverflowError):
+                        ok = False
+                if not ok:
+                    v = 0
+                valid.append(ok)
+            values.append(v)
+        if self._exported:
+            self._detach()
+        for col, v in zip(self._cols.values(), values):
+            col.append(v)
+        for flags, ok in zip(self._valid.values(), valid):
+            flags.append(ok)
+        self._len += 1
+
+    def extend(self, rows: Iterable[Mapping[str, Any]]) -> None:
+        for row in rows:
+            self.append(row)
+
+    def value(self, column: str, i: int) -> Any:
+        kind = self.schema[column]
+        v = self._cols[column][i]
+        if kind == FLOAT:
+            return None if math.isnan(v) else v
+        if kind == INT:
+            return v if self._valid[column][i] else None
+        if kind == BOOL:
+            return bool(v) if self._valid[column][i] else None
+        return v
+
+    def take(self, order: Sequence[int]) -> "ColumnarRows":
+        """New store with rows in ``order`` (indices into this one)."""
+        out = ColumnarRows(self.schema)
+        out._interned = self._interned
+        for c, col in self._cols.items():
+            picked = [col[i] for i in order]
+            out._cols[c] = array(col.typecode, picked) if isinstance(col, array) else picked
+            if c in self._valid:
+                out._valid[c] = bytearray(self._valid[c][i] for i in order)
+        out._len = len(order)
+        return out
+
+    def set_column(self, column: str, values: np.ndarray) -> None:
+        """Replace a FLOAT column from a float array (NaN = missing), e.g. computed analytics."""
+        if self.schema.get(column) != FLOAT or len(values) != self._len:
+            raise ValueError(f"cannot set {column!r} from {len(values)} values")
+        self._cols[column] = array("d", np.ascontiguousarray(values, dtype=np.float64).tobytes())
+
+    def numpy(self, column: str) -> np.ndarray:
+        """Column as a NumPy array; numeric columns are views on the typed buffer (no copy)."""
+        kind = self.schema[column]
+        col = self._cols[column]
+        if kind == STR:
+            out = np.empty(self._len, dtype=object)
+            out[:] = col
+            return out
+        self._exported = True
+        view = np.frombuffer(col, dtype={FLOAT: np.float64, INT: np.int64, BOOL: np.bool_}[kind])
+        view.flags.writeable = False  # frames must not write through into the store
+        if kind in (INT, BOOL) and not all(self._valid[column]):
+            valid = np.frombuffer(self._valid[column], dtype=np.bool_)
+            if kind == INT:
+                return np.where(valid, view, np.nan)
+            out = view.astype(object)
+            out[~valid] = None
+            return out
+        return view
+
+    def to_pandas(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """DataFrame with ``columns`` (default: the schema order); unknown columns are all-None."""
+        data = {}
+        for c in columns or list(self.schema):
+            if c in self.schema:
+                data[c] = self.numpy(c)
+            else:
+                data[c] = np.full(self._len, None, dtype=object)
+        return pd.DataFrame(data, copy=False)
+
+    def to_arrow(self, columns: Optional[List[str]] = None):
+        """pyarrow Table; float/int data buffers are shared with the typed arrays (NaN and
+        missing int/bool -> null)."""
+        import pyarrow as pa
+        arrays = []
+        names = columns or list(self.schema)
+        for c in names:
+            kind = self.schema.get(c)
+            if kind is None:
+                arrays.append(pa.nulls(self._len))
+            elif kind in (INT, BOOL):
+                self._exported = True
+                values = np.frombuffer(self._cols[c], dtype=np.int64 if kind == INT else np.bool_)
+                valid = np.frombuffer(self._valid[c], dtype=np.bool_)
+                arrays.append(pa.array(values, mask=~valid))
+            elif kind == STR:
+                arrays.append(pa.array(self._cols[c], from_pandas=True))
+            else:
+                arrays.append(pa.array(self.numpy(c), from_pandas=True))
+        return pa.Table.from_arrays(arrays, names=names)
+
+
+def frame_of(rows: Any, schema: Mapping[str, str]) -> pd.DataFrame:
+    """DataFrame with exactly the ``schema`` columns from a ColumnarRows or a list of dicts."""
+    store = rows if isinstance(rows, ColumnarRows) else ColumnarRows.from_rows(rows or [], schema)
+    return store.to_pandas(list(schema))
@@ -0,0 +1,413 @@
+"""Streaming write-back of results into the tracking Excel workbook.
+
+The .xlsx is rewritten at the zip level: every part we do not change is copied through
+as bytes, and the one sheet we change is transformed row by row, so no openpyxl cell
+objects are created for any sheet and memory stays flat with workbook size. Output goes
+to a temp file next to the workbook and replaces it with ``os.replace``, so a crash or a
+locked file leaves the original untouched.
+
+Modes:
+- ``columns``: update/append the result columns next to the URL column of ``sheet``
+  (same column resolution as ``load_excel``); only changed cells are rewritten and
+  existing cell styles are kept. Cells holding formulas are never overwritten.
+- ``sheet``: add (or replace) a sheet named after the run date holding the results table.
+"""
+from __future__ import annotations
+from typing import Dict, Any, List, Optional, Tuple, IO
+import itertools
+import math
+import os
+import posixpath
+import re
+import shutil
+import xml.etree.ElementTree as ET
+import zipfile
+from html import unescape
+from xml.sax.saxutils import escape, quoteattr
+from openpyxl.utils import column_index_from_string, get_column_letter
+from .writeback import locate_columns, same_value, results_by_key, RESULT_COLUMNS
+from .fund_identity import fund_key
+
+CHUNK = 1 << 20
+
+NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+NS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+WORKSHEET_REL_TYPE = NS_REL + "/worksheet"
+WORKSHEET_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"
+
+WORKBOOK_PART = "xl/workbook.xml"
+WORKBOOK_RELS_PART = "xl/_rels/workbook.xml.rels"
+CONTENT_TYPES_PART = "[Content_Types].xml"
+SHARED_STRINGS_PART = "xl/sharedStrings.xml"
+
+_SHEETDATA_RE = re.compile(rb"<(?:\w+:)?sheetData\b[^>]*?(/?)>")
+_ROW_RE = re.compile(rb"<(\w+:|)row\b[^>]*?(?:/>|>.*?</\1row>)", re.S)
+_ROW_OPEN_RE = re.compile(rb"<(\w+:|)row\b([^>]*?)(/?)>")
+_CELL_RE = re.compile(rb"<(?:\w+:)?c\b([^>]*?)(?:/>|>(.*?)</(?:\w+:)?c>)", re.S)
+_ATTR_RE = re.compile(rb"([\w:]+)\s*=\s*[\"']([^\"']*)[\"']")
+_V_RE = re.compile(rb"<(?:\w+:)?v>(.*?)</(?:\w+:)?v>", re.S)
+_T_RE = re.compile(rb"<(?:\w+:)?t\b[^>]*>(.*?)</(?:\w+:)?t>", re.S)
+_FORMULA_RE = re.compile(rb"<(?:\w+:)?f\b")
+_SPANS_RE = re.compile(rb"\s+spans\s*=\s*[\"'][^\"']*[\"']")
+_DIMENSION_RE = re.compile(rb"(<(?:\w+:)?dimension\s+ref\s*=\s*[\"'])([^\"']*)([\"'])")
+_REF_RE = re.compile(rb"([A-Z]+)(\d+)")
+_NUMBER_RE = re.compile(r"^-?\d+(?:\.\d+)?$")
+
+
+# --- package helpers ---------------------------------------------------------
+
+def _sheet_parts(zin: zipfile.ZipFile) -> Dict[str, str]:
+    """Sheet name -> zip part path."""
+    wb = ET.fromstring(zin.read(WORKBOOK_PART))
+    rels = ET.fromstring(zin.read(WORKBOOK_RELS_PART))
+    targets = {}
+    for rel in rels.iter(f"{{{NS_PKG_REL}}}Relationship"):
+        target = rel.get("Target", "")
+        path = target.lstrip("/") if target.startswith("/") else posixpath.normpath(
+            posixpath.join("xl", target))
+        targets[rel.get("Id")] = path
+    return {sh.get("name"): targets.get(sh.get(f"{{{NS_REL}}}id"))
+            for sh in wb.iter(f"{{{NS_MAIN}}}sheet")}
+
+
+def _shared_strings(zin: zipfile.ZipFile) -> List[str]:
+    if SHARED_STRINGS_PART not in zin.namelist():
+        return []
+    out: List[str] = []
+    with zin.open(SHARED_STRINGS_PART) as f:
+        for _, el in ET.iterparse(f, events=("end",)):
+            if el.tag == f"{{{NS_MAIN}}}si":
+                out.append("".join(t.text or "" for t in el.iter(f"{{{NS_MAIN}}}t")))
+                el.clear()
+    return out
+
+
+def _insert_before_close(xml: bytes, tag: bytes, fragment: bytes) -> bytes:
+    m = list(re.finditer(rb"</(?:\w+:)?" + tag + rb">", xml))
+    if not m:
+        raise ValueError(f"closing </{tag.decode()}> not found")
+    pos = m[-1].start()
+    return xml[:pos] + fragment + xml[pos:]
+
+
+def _add_sheet_entries(zin: zipfile.ZipFile, name: str) -> Tuple[str, Dict[str, bytes]]:
+    """Register a new worksheet part; returns (part path, rewritten package parts)."""
+    names = set(zin.namelist())
+    n = 1
+    while f"xl/worksheets/sheet{n}.xml" in names:
+        n += 1
+    part = f"xl/worksheets/sheet{n}.xml"
+
+    wb_xml = zin.read(WORKBOOK_PART)
+    rels_xml = zin.read(WORKBOOK_RELS_PART)
+    ct_xml = zin.read(CONTENT_TYPES_PART)
+
+    ids = {int(x) for x in re.findall(rb"sheetId\s*=\s*[\"'](\d+)", wb_xml)}
+    rel_ids = set(re.findall(rb"Id\s*=\s*[\"']([^\"']+)", rels_xml))
+    k = len(rel_ids) + 1
+    while f"rId{k}".encode() in rel_ids:
+        k += 1
+    rel_id = f"rId{k}"
+
+    m = re.search(rb"xmlns:(\w+)\s*=\s*[\"']" + re.escape(NS_REL.encode()), wb_xml)
+    ns_decl = "" if m else f' xmlns:r="{NS_REL}"'
+    r_prefix = m.group(1).decode() if m else "r"
+    m_main = re.search(rb"<(\w+:|)sheets\b", wb_xml)
+    p = m_main.group(1).decode() if m_main else ""
+
+    sheet_el = (f"<{p}sheet name={quoteattr(name)} sheetId=\"{max(ids, default=0) + 1}\""
+                f"{ns_decl} {r_prefix}:id=\"{rel_id}\"/>").encode()
+    rel_el = (f"<Relationship Id=\"{rel_id}\" Type=\"{WORKSHEET_REL_TYPE}\" "
+              f"Target=\"worksheets/sheet{n}.xml\"/>").encode()
+    ct_el = (f"<Override PartName=\"/{part}\" "
+             f"ContentType=\"{WORKSHEET_CONTENT_TYPE}\"/>").encode()
+    return part, {
+        WORKBOOK_PART: _insert_before_close(wb_xml, b"sheets", sheet_el),
+        WORKBOOK_RELS_PART: _insert_before_close(rels_xml, b"Relationships", rel_el),
+        CONTENT_TYPES_PART: _insert_before_close(ct_xml, b"Types", ct_el),
+    }
+
+
+# --- cell helpers ------------------------------------------------------------
+
+def _attrs(raw: bytes) -> Dict[bytes, bytes]:
+    return dict(_ATTR_RE.findall(raw))
+
+
+def _cell_value(attrs: Dict[bytes, bytes], inner: Optional[bytes], sst: List[str]) -> Optional[str]:
+    if not inner:
+        return None
+    t = attrs.get(b"t", b"n")
+    if t == b"inlineStr":
+        return unescape(b"".join(_T_RE.findall(inner)).decode("utf-8"))
+    m = _V_RE.search(inner)
+    if not m:
+        return None
+    v = unescape(m.group(1).decode("utf-8"))
+    if t == b"s":
+        try:
+            return sst[int(v)]
+        except (ValueError, IndexError):
+            return None
+    return v
+
+
+def _new_cell(prefix: bytes, ref: str, value: Any, style: Optional[bytes] = None) -> bytes:
+    p = prefix.decode()
+    s = f' s="{style.decode()}"' if style else ""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return f'<{p}c r="{ref}"{s}/>'.encode()
+    if isinstance(value, bool):
+        return f'<{p}c r="{ref}"{s} t="b"><{p}v>{int(value)}</{p}v></{p}c>'.encode()
+    if isinstance(value, str) and _NUMBER_RE.match(value.strip()):
+        value = float(value)
+    if isinstance(value, float) and not math.isfinite(value):
+        return f'<{p}c r="{ref}"{s}/>'.encode()
+    if isinstance(value, (int, float)):
+        return f'<{p}c r="{ref}"{s}><{p}v>{value!r}</{p}v></{p}c>'.encode()
+    text = escape(str(value))
+    return (f'<{p}c r="{ref}"{s} t="inlineStr"><{p}is><{p}t xml:space="preserve">{text}'
+            f'</{p}t></{p}is></{p}c>').encode("utf-8")
+
+
+def _parse_row(row: bytes):
+    """-> (prefix, row attrs, {col index: (attrs, inner, raw bytes)}, trailing non-cell bytes)."""
+    m = _ROW_OPEN_RE.match(row)
+    prefix, head = m.group(1), m.group(2)
+    cells: Dict[int, Tuple[Dict[bytes, bytes], Optional[bytes], bytes]] = {}
+    rest = b""
+    if not m.group(3):
+        body = row[m.end():row.rindex(b"</")]
+        col = -1
+        for cm in _CELL_RE.finditer(body):
+            attrs = _attrs(cm.group(1))
+            ref = _REF_RE.match(attrs.get(b"r", b""))
+            col = column_index_from_string(ref.group(1).decode()) - 1 if ref else col + 1
+            cells[col] = (attrs, cm.group(2), cm.group(0))
+        rest = _CELL_RE.sub(b"", body).strip()
+    return prefix, head, cells, rest
+
+
+def _build_row(prefix: bytes, head: bytes, cells: Dict[int, bytes], rest: bytes) -> bytes:
+    body = b"".join(cells[c] for c in sorted(cells)) + rest
+    head = _SPANS_RE.sub(b"", head)
+    return b"<" + prefix + b"row" + head + b">" + body + b"</" + prefix + b"row>"
+
+
+# --- streaming transforms ----------------------------------------------------
+
+def _iter_rows(src: IO[bytes]):
+    """Yield ("raw", bytes) for everything around the rows (the prefix up to and including
+    <sheetData>, then the tail up to the end of the current buffer) and ("row", bytes) per
+    <row> element. After the generator ends, the rest of ``src`` is untouched tail."""
+    buf = b""
+    while True:
+        m = _SHEETDATA_RE.search(buf)
+        if m:
+            break
+        chunk = src.read(CHUNK)
+        if not chunk:
+            yield "raw", buf
+            return
+        buf += chunk
+    yield "raw", buf[:m.end()]
+    buf = buf[m.end():]
+    if m.group(1):  # <sheetData/>
+        yield "raw", buf
+        return
+
+    pos = 0
+    eof = False
+    while True:
+        while pos < len(buf) and buf[pos:pos + 1].isspace():
+            pos += 1
+        rm = _ROW_RE.match(buf, pos)
+        if rm:
+            yield "row", rm.group(0)
+            pos = rm.end()
+            continue
+        if buf.startswith(b"</", pos) or eof:
+            yield "raw", buf[pos:]
+            return
+        chunk = src.read(CHUNK)
+        buf = buf[pos:] + chunk
+        pos = 0
+        eof = not chunk
+
+
+def _used_width(src: IO[bytes]) -> int:
+    """Columns in use: the <dimension> end column, or the last cell holding a value in any
+    row, whichever is further right. A separate pass, since the header row that decides
+    where result columns go comes before the data rows."""
+    width = 0
+    for kind, data in _iter_rows(src):
+        if kind == "raw":
+            dm = _DIMENSION_RE.search(data)
+            e = _REF_RE.match(dm.group(2).split(b":")[-1]) if dm else None
+            if e:
+                width = max(width, column_index_from_string(e.group(1).decode()))
+            continue
+        _, _, cells, _ = _parse_row(data)
+        filled = [c for c, (_, inner, _) in cells.items() if inner and inner.strip()]
+        width = max(width, max(filled, default=-1) + 1)
+    return width
+
+
+def _update_columns(src: IO[bytes], dst: IO[bytes], sst: List[str], results: List[Dict[str, Any]],
+                    row_start: int, overrides: Dict[str, Optional[str]],
+                    used_cols: int = 0) -> Dict[str, int]:
+    by_key = results_by_key(results)
+    stats = {"rows": 0, "cells": 0, "formula_skipped": 0}
+    # output is held back until the header row tells us how far <dimension> must widen
+    pending: List[bytes] = []
+    header_done = False
+    url_idx: Optional[int] = None
+    positions: Dict[str, int] = {}
+    row_no = 0
+
+    def emit(data: bytes):
+        if header_done:
+            dst.write(data)
+        else:
+            pending.append(data)
+
+    def flush(max_col: int):
+        def widen(m):
+            ref = m.group(2)
+            if b":" in ref:
+                start, end = ref.split(b":", 1)
+                e = _REF_RE.match(end)
+                if e and column_index_from_string(e.group(1).decode()) < max_col:
+                    ref = start + b":" + get_column_letter(max_col).encode() + e.group(2)
+            return m.group(1) + ref + m.group(3)
+
+        if pending:
+            pending[0] = _DIMENSION_RE.sub(widen, pending[0], count=1)
+        for part in pending:
+            dst.write(part)
+        pending.clear()
+
+    for kind, data in _iter_rows(src):
+        if kind == "raw":
+            emit(data)
+            continue
+        m = _ROW_OPEN_RE.match(data)
+        r_attr = _attrs(m.group(2)).get(b"r")
+        row_no = int(r_attr) if r_attr else row_no + 1
+        if row_no < row_start or (header_done and url_idx is None):
+            emit(data)
+            continue
+
+        p, head, cells, rest = _parse_row(data)
+        out = {c: raw for c, (_, _, raw) in cells.items()}
+        changed = False
+        if not header_done:
+            ncols = max(cells, default=-1) + 1
+            headers = [_cell_value(*cells[c][:2], sst) if c in cells else None
+                       for c in range(ncols)]
+            url_idx, positions, appended = locate_columns(headers, overrides, used_cols)
+            for idx, name in appended:
+                out[idx] = _new_cell(p, f"{get_column_letter(idx + 1)}{row_no}", name)
+                changed = True
+            pending.append(_build_row(p, head, out, rest) if changed else data)
+            flush(max(positions.values(), default=-1) + 1)
+            header_done = True
+            continue
+
+        stats["rows"] += 1
+        url = _cell_value(*cells[url_idx][:2], sst) if url_idx in cells else None
+        res = by_key.get(fund_key(url)) if url and url.strip() else None
+        if res is not None:
+            for col, idx in positions.items():
+                new = res.get(col)
+                attrs, inner, _ = cells.get(idx, ({}, None, b""))
+                if same_value(_cell_value(attrs, inner, sst), new):
+                    continue
+                if inner and _FORMULA_RE.search(inner):
+                    stats["formula_skipped"] += 1
+                    continue
+                out[idx] = _new_cell(p, f"{get_column_letter(idx + 1)}{row_no}", new,
+                                     attrs.get(b"s"))
+                stats["cells"] += 1
+                changed = True
+        dst.write(_build_row(p, head, out, rest) if changed else data)
+
+    flush(0)  # header row never seen: pass everything through unchanged
+    shutil.copyfileobj(src, dst, CHUNK)
+    return stats
+
+
+def _write_table(dst: IO[bytes], rows: List[Dict[str, Any]], columns: List[str]) -> None:
+    dst.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n')
+    dst.write(f'<worksheet xmlns="{NS_MAIN}"><sheetData>'.encode())
+    for i, values in enumerate(itertools.chain([dict(zip(columns, columns))], rows), start=1):
+        cells = b"".join(_new_cell(b"", f"{get_column_letter(j)}{i}", values.get(c))
+                         for j, c in enumerate(columns, start=1))
+        dst.write(f'<row r="{i}">'.encode() + cells + b"</row>")
+    dst.write(b"</sheetData></worksheet>")
+
+
+# --- public API --------------------------------------------------------------
+
+def write_back_excel(path: str, results: List[Dict[str, Any]], sheet: str, row_start: int,
+                     overrides: Dict[str, Optional[str]], mode: str = "columns",
+                     new_sheet_name: Optional[str] = None,
+                     columns: Optional[List[str]] = None) -> Dict[str, int]:
+    """Write ``results`` into the workbook at ``path`` atomically; see module docstring.
+    ``columns`` is the table layout for ``sheet`` mode. Returns counters for logging."""
+    if mode not in ("columns", "sheet"):
+        raise ValueError(f"unknown write-back mode {mode!r}")
+    directory, base = os.path.split(os.path.abspath(path))
+    tmp = os.path.join(directory, f".{base}.{os.getpid()}.tmp")
+    stats: Dict[str, int] = {}
+    try:
+        with zipfile.ZipFile(path) as zin, zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as zout:
+            parts = _sheet_parts(zin)
+            replaced: Dict[str, bytes] = {}
+            if mode == "columns":
+                target = parts.get(sheet)
+                if target is None:
+                    raise ValueError(f"sheet {sheet!r} not found in {path}")
+                sst = _shared_strings(zin)
+            else:
+                name = new_sheet_name or "results"
+                target = parts.get(name)
+                if target is None:
+                    target, replaced = _add_sheet_entries(zin, name)
+
+            for item in zin.infolist():
+                if item.filename == target:
+                    continue
+                info = zipfile.ZipInfo(item.filename, date_time=item.date_time)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                info.external_attr = item.external_attr
+                if item.filename in replaced:
+                    zout.writestr(info, replaced[item.filename])
+                    continue
+                with zin.open(item) as src, zout.open(info, "w", force_zip64=True) as dst:
+                    shutil.copyfileobj(src, dst, CHUNK)
+
+            info = zipfile.ZipInfo(target)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with zout.open(info, "w", force_zip64=True) as dst:
+                if mode == "columns":
+                    with zin.open(target) as src:
+                        used_cols = _used_width(src)
+                    with zin.open(target) as src:
+                        stats = _update_columns(src, dst, sst, results, row_start, overrides,
+                                                used_cols)
+                else:
+                    columns = columns or RESULT_COLUMNS
+                    _write_table(dst, results, columns)
+                    stats = {"rows": len(results), "cells": len(results) * len(columns)}
+        with open(tmp, "rb+") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    return stats
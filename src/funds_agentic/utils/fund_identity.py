@@ -0,0 +1,89 @@
+"""Canonical fund identity: URL normalization, stable fund keys and a persistent index.
+
+Trustnet reaches the same fund through many URLs (http/https, ``www.`` or not, trailing
+slashes, query strings, tab sub-paths like ``/performance``, legacy
+``Factsheet.aspx?fundCode=..&univ=..``). ``fund_key`` reduces them to ``UNIVERSE:CITICODE``
+(e.g. ``O:G6AI``); URLs we do not recognise fall back to their canonical form.
+"""
+from __future__ import annotations
+from typing import Dict, Any, List, Optional
+from urllib.parse import urljoin, urlsplit, urlunsplit, parse_qsl, urlencode
+import re
+from .json_store import JsonStore
+
+TRUSTNET_BASE = "https://www.trustnet.com"
+INDEX_FILENAME = "fund_index.json"
+
+# /factsheets/<universe>/<citicode>/<slug>[/<tab>...]
+_FACTSHEET_RE = re.compile(r"^/factsheets/([a-z])/([a-z0-9]+)(?:/([^/]+))?", re.I)
+_DROP_PARAMS = re.compile(r"^(utm_.*|gclid|fbclid|mc_[a-z]+)$", re.I)
+# scheme-less absolute URLs as typed into sheets: www.trustnet.com/..., trustnet.com/...
+_BARE_HOST_RE = re.compile(r"^(?:www\.|trustnet\.com\b|[\w.-]+\.\w+/)", re.I)
+
+
+def canonical_url(url: str, base: str = TRUSTNET_BASE) -> str:
+    """Normalized absolute URL: https, lower-case host, no default port, fragment,
+    tracking params or trailing slash; remaining query params sorted. Fund factsheet
+    URLs are cut back to ``/factsheets/<universe>/<citicode>/<slug>``."""
+    url = (url or "").strip()
+    if _BARE_HOST_RE.match(url):
+        url = "https://" + url
+    url = urljoin(base + "/", url)
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if host == "trustnet.com":
+        host = "www.trustnet.com"
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    scheme = "https" if parts.scheme in ("http", "https") else parts.scheme
+    path = re.sub(r"/{2,}", "/", parts.path).rstrip("/") or "/"
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if not _DROP_PARAMS.match(k)]
+
+    m = _FACTSHEET_RE.match(path)
+    if m:
+        universe, code, slug = m.group(1).lower(), m.group(2).lower(), m.group(3)
+        path = f"/factsheets/{universe}/{code}" + (f"/{slug.lower()}" if slug else "")
+        query = []
+    return urlunsplit((scheme, host, path, urlencode(sorted(query), safe=":"), ""))
+
+
+def fund_key(url: str) -> str:
+    """Stable identity of the fund behind ``url`` (``UNIVERSE:CITICODE`` when known)."""
+    canon = canonical_url(url)
+    parts = urlsplit(canon)
+    m = _FACTSHEET_RE.match(parts.path)
+    if m:
+        return f"{m.group(1).upper()}:{m.group(2).upper()}"
+    q = {k.lower(): v for k, v in parse_qsl(parts.query)}
+    if "fundcode" in q:
+        return f"{q.get('univ', 'O').upper()}:{q['fundcode'].upper()}"
+    return canon
+
+
+def dedupe_by_fund(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Collapse rows that point at the same fund, keep first-seen order.
+    Adds ``fund_key``/``canonical_url``; a fund held on any duplicate row stays held."""
+    out: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        key = fund_key(row["url"])
+        first = out.get(key)
+        if first is None:
+            out[key] = dict(row, fund_key=key, canonical_url=canonical_url(row["url"]))
+            continue
+        first["hold"] = bool(first.get("hold")) or bool(row.get("hold"))
+        if first.get("holding_pct") is None:
+            first["holding_pct"] = row.get("holding_pct")
+    return list(out.values())
+
+
+class FundIndex(JsonStore):
+    """``fund_index.json`` in the output directory: fund key -> last-seen URL and name."""
+    FILENAME = INDEX_FILENAME
+
+    def update(self, key: str, url: str, fund_name: Optional[str], seen: str) -> None:
+        e = self.entries.setdefault(key, {})
+        e["url"] = url
+        if fund_name:
+            e["fundName"] = fund_name
+        e["lastSeen"] = seen
@@ -4,6 +4,7 @@ from typing import Dict, Any, List, Optional
 import pandas as pd
 
 from funds_agentic.utils.logging_setup import setup_logger
+from funds_agentic.utils.fund_identity import dedupe_by_fund
 
 logger = setup_logger()
 
@@ -97,18 +98,11 @@ def load_excel(path: str, sheet: str, row_start: int, overrides: Dict[str, Optio
         rows.append({"url": str(url).strip(),
                     "hold": hold, "holding_pct": holding})
 
-    # De-duplicate exact URLs, keep first occurrence
-    seen = set()
-    dedup = []
-    for index, row in enumerate(rows):
-        # Limit the number of URL's for testing
-        # if index > 3:
-        #     logger.debug(f"BREAK after First {index} rows for debug")
-        #     break
-        if row["url"] in seen:
-            continue
-        seen.add(row["url"])
-        dedup.append(row)
-
+    # De-duplicate by canonical fund identity, keep first occurrence
+    # Limit the number of URL's for testing: rows = rows[:4]
+    dedup = dedupe_by_fund(rows)
+    if len(dedup) < len(rows):
+        logger.info("duplicates_collapsed", extra={"kv": {
+            "step": "load_excel", "rows": len(rows), "funds": len(dedup)}})
     return dedup
 
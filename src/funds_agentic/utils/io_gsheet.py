@@ -1,4 +1,4 @@
-"""Google Sheets ingestion using gspread (service account).
+"""Google Sheets ingestion (and optional result write-back) using gspread (service account).
 Provide either GOOGLE_APPLICATION_CREDENTIALS path env var or a JSON blob via GOOGLE_SERVICE_ACCOUNT_JSON.
 """
 from __future__ import annotations
@@ -7,23 +7,30 @@ import os
 import json
 import pandas as pd
 import gspread
+from gspread.utils import rowcol_to_a1, ValueRenderOption
 from google.oauth2.service_account import Credentials
 from .io_excel import resolve_columns, to_bool, to_pct
+from .writeback import plan_updates, group_runs, used_width
+from .fund_identity import dedupe_by_fund
 
 SCOPES = [
     "https://www.googleapis.com/auth/spreadsheets.readonly",
     "https://www.googleapis.com/auth/drive.readonly",
 ]
+WRITE_SCOPES = [
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive.readonly",
+]
 
 
-def _get_credentials() -> Credentials:
+def _get_credentials(scopes: List[str] = SCOPES) -> Credentials:
     blob = os.getenv("GOOGLE_SERVICE_ACCOUNT_JSON")
     path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
     if blob:
         info = json.loads(blob)
-        return Credentials.from_service_account_info(info, scopes=SCOPES)
+        return Credentials.from_service_account_info(info, scopes=scopes)
     if path and os.path.exists(path):
-        return Credentials.from_service_account_file(path, scopes=SCOPES)
+        return Credentials.from_service_account_file(path, scopes=scopes)
     raise RuntimeError(
         "Google credentials not provided. Set GOOGLE_APPLICATION_CREDENTIALS or GOOGLE_SERVICE_ACCOUNT_JSON.")
 
@@ -62,12 +69,48 @@ def load_gsheet(gsheet_url: Optional[str], gdrive_id: Optional[str], sheet: str,
         holding = to_pct(r.get(cols["holding"]) if cols["holding"] else None)
         out.append({"url": str(url).strip(),
                    "hold": hold, "holding_pct": holding})
-    # de-duplicate
-    seen = set()
-    dedup = []
-    for row in out:
-        if row["url"] in seen:
-            continue
-        seen.add(row["url"])
-        dedup.append(row)
-    return dedup
+    # de-duplicate by canonical fund identity
+    return dedupe_by_fund(out)
+
+
+def write_back_gsheet(results: List[Dict[str, Any]], gsheet_url: Optional[str], gdrive_id: Optional[str],
+                      sheet: str, row_start: int, overrides: Dict[str, Optional[str]], client=None) -> int:
+    """Write scraped columns back next to each URL row of ``sheet``.
+
+    Only cells whose value changed are sent, all in one ``batch_update`` call.
+    ``client`` may be any object with gspread's ``open_by_url``/``open_by_key`` API
+    (e.g. a local stub); by default a service-account client with write scope is used.
+    Returns the number of cells updated.
+    """
+    gc = client if client is not None else gspread.authorize(
+        _get_credentials(WRITE_SCOPES))
+    sh = gc.open_by_url(
+        gsheet_url) if gsheet_url else gc.open_by_key(gdrive_id)
+    ws = sh.worksheet(sheet)
+    # raw cell values, not display strings: a column shown as "1.2" or "£2.50" must
+    # compare equal to the scraped 1.23 / "2.50" or it would be rewritten every run
+    data = ws.get_all_values(value_render_option=ValueRenderOption.unformatted)
+
+    header_idx = max(0, row_start - 1)
+    if header_idx >= len(data):
+        return 0
+    # width over the whole sheet: rows above the header (titles, notes) count as used too
+    cells = plan_updates(data[header_idx], data[header_idx + 1:], results, overrides,
+                         used_cols=used_width(data))
+    if not cells:
+        return 0
+
+    needed_cols = max(c for _, c, _ in cells) + 1
+    col_count = getattr(ws, "col_count", None)
+    if col_count is not None and needed_cols > col_count:
+        ws.add_cols(needed_cols - col_count)
+
+    # grid row 0 is the header row, i.e. sheet row header_idx + 1 (1-based)
+    ranges = []
+    for r, c, values in group_runs(cells):
+        first = rowcol_to_a1(header_idx + 1 + r, c + 1)
+        last = rowcol_to_a1(header_idx + 1 + r, c + len(values))
+        ranges.append({"range": f"{first}:{last}",
+                       "values": [["" if v is None else v for v in values]]})
+    ws.batch_update(ranges, value_input_option="USER_ENTERED")
+    return len(cells)
@@ -0,0 +1,36 @@
+"""Small JSON files in the output directory that persist between runs.
+
+``JsonStore`` holds a dict of ``entries``; subclasses set ``FILENAME`` (and ``INDENT``).
+A missing or corrupt file loads as empty; ``save`` writes a temp file and ``os.replace``s
+it, so a crash mid-write leaves the previous file intact.
+"""
+from __future__ import annotations
+from typing import Dict, Any, Optional, Type, TypeVar
+import json
+import os
+
+S = TypeVar("S", bound="JsonStore")
+
+
+class JsonStore:
+    FILENAME = ""
+    INDENT: Optional[int] = 1  # None = compact
+
+    def __init__(self, path: str, entries: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = entries or {}
+
+    @classmethod
+    def load(cls: Type[S], output_dir: str) -> S:
+        path = os.path.join(output_dir, cls.FILENAME)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return cls(path, json.load(f))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return cls(path)
+
+    def save(self) -> None:
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=self.INDENT, sort_keys=self.INDENT is not None)
+        os.replace(tmp, self.path)
@@ -1,5 +1,18 @@
+"""Logging pipeline: nodes enqueue records, a background listener formats and writes them.
+
+The hot path only pays for a non-blocking ``queue.put``; formatting and stdout I/O
+happen on the listener thread. Output is ``key=value`` (default) or JSON lines, and
+high-volume events (e.g. ``fund_scraped``) can be sampled per event name.
+"""
+import atexit
+import json
 import logging
+import logging.handlers
+import os
+import queue
 import sys
+import threading
+from typing import Dict, Optional
 
 
 class KeyValueFormatter(logging.Formatter):
@@ -14,12 +27,127 @@ class KeyValueFormatter(logging.Formatter):
         return " ".join(f"{k}={repr(v)}" if isinstance(v, str) else f"{k}={v}" for k, v in base.items())
 
 
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per line; non-serializable values fall back to ``str``."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        base = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "msg": record.getMessage(),
+        }
+        if hasattr(record, "kv") and isinstance(record.kv, dict):
+            base.update(record.kv)
+        return json.dumps(base, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a deterministic fraction of records per event name (the log message).
+
+    ``rates`` maps event -> keep ratio in [0, 1]; events not listed are always kept.
+    Warnings and errors are never sampled out.
+    """
+
+    def __init__(self, rates: Optional[Dict[str, float]] = None):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._acc: Dict[str, float] = {}
+        self.rates: Dict[str, float] = {}
+        self.set_rates(rates or {})
+
+    def set_rates(self, rates: Dict[str, float]) -> None:
+        with self._lock:
+            self.rates = {k: min(1.0, max(0.0, float(v)))
+                          for k, v in rates.items()}
+            self._acc = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(record.msg) if isinstance(
+            record.msg, str) else None
+        if rate is None or rate >= 1.0:
+            return True
+        with self._lock:
+            # accumulator: emits exactly ``rate`` of the records, evenly spaced
+            acc = self._acc.get(record.msg, 0.0) + rate
+            keep = acc >= 1.0
+            self._acc[record.msg] = acc - 1.0 if keep else acc
+        return keep
+
+
+FORMATTERS = {
+    "kv": KeyValueFormatter,
+    "json": JsonLinesFormatter,
+}
+
+_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_stream_handler = logging.StreamHandler(sys.stdout)
+_stream_handler.setFormatter(
+    FORMATTERS.get(os.getenv("LOG_FORMAT", "kv"), KeyValueFormatter)())
+_sampler = SamplingFilter()
+_listener: Optional[logging.handlers.QueueListener] = None
+_listener_lock = threading.Lock()
+
+
+def parse_sample_spec(specs) -> Dict[str, float]:
+    """Parse ``["fund_scraped=0.1", ...]`` (or a comma-separated string) into rates."""
+    if not specs:
+        return {}
+    if isinstance(specs, str):
+        specs = specs.split(",")
+    rates: Dict[str, float] = {}
+    for spec in specs:
+        spec = spec.strip()
+        if not spec:
+            continue
+        event, sep, rate = spec.partition("=")
+        if not sep:
+            raise ValueError(f"invalid log sample spec {spec!r}, expected EVENT=RATE")
+        rates[event.strip()] = float(rate)
+    return rates
+
+
+_sampler.set_rates(parse_sample_spec(os.getenv("LOG_SAMPLE")))
+
+
+def _ensure_listener() -> None:
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            _listener = logging.handlers.QueueListener(
+                _queue, _stream_handler, respect_handler_level=False)
+            _listener.start()
+            atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Drain the queue and stop the listener thread (registered with ``atexit``)."""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+    _stream_handler.flush()
+
+
+def configure_logging(fmt: Optional[str] = None, sample: Optional[Dict[str, float]] = None) -> None:
+    """Switch the output format and/or sampling rates at runtime (e.g. from CLI flags)."""
+    if fmt is not None:
+        if fmt not in FORMATTERS:
+            raise ValueError(f"unknown log format {fmt!r}")
+        _stream_handler.setFormatter(FORMATTERS[fmt]())
+    if sample is not None:
+        _sampler.set_rates(sample)
+
+
 def setup_logger(name: str = "funds_agentic", level: int = logging.INFO) -> logging.Logger:
     logger = logging.getLogger(name)
     logger.setLevel(level)
     if not logger.handlers:
-        handler = logging.StreamHandler(sys.stdout)
-        handler.setFormatter(KeyValueFormatter())
+        handler = logging.handlers.QueueHandler(_queue)
+        handler.addFilter(_sampler)
         logger.addHandler(handler)
+        _ensure_listener()
     logger.propagate = False
     return logger
@@ -0,0 +1,95 @@
+"""Page navigation strategies.
+
+``load`` keeps the legacy behaviour (wait for the full ``load`` event). ``commit`` and
+``domcontentloaded`` return from ``goto`` early, then wait only for the selectors the
+extractor needs (each with its own deadline) and stop the remaining page load.
+"""
+from __future__ import annotations
+import time
+from typing import Iterable, Tuple
+from urllib.parse import urlsplit
+from playwright.sync_api import TimeoutError as PWTimeout
+from .logging_setup import setup_logger
+
+logger = setup_logger()
+
+NAV_STRATEGIES = ("load", "domcontentloaded", "commit")
+# HTTP statuses that mean the page is gone rather than temporarily unavailable
+PERMANENT_STATUSES = {404, 410}
+
+ReadySelector = Tuple[str, float, bool]  # (selector, deadline_sec, required)
+
+
+class PermanentNavigationError(RuntimeError):
+    """The page is gone (404/410) or redirected somewhere else (e.g. a search page);
+    retrying will not help."""
+
+
+def wait_ready(page, ready: Iterable[ReadySelector], started: float, timeout_sec: float) -> None:
+    """Wait for the required selectors until their deadlines (seconds since ``started``),
+    then for the optional ones until theirs, counted from when the required ones were
+    present, so a slow required element does not leave the optional ones no time at all.
+    Raises PWTimeout if a required selector misses its deadline; optional ones are skipped.
+    Nothing waits past ``timeout_sec`` after ``started``.
+    """
+    optional_from = None
+    for selector, deadline_sec, required in sorted(ready, key=lambda r: not r[2]):
+        if not required and optional_from is None:
+            optional_from = time.monotonic()
+        start = started if required else optional_from
+        budget = min(start + deadline_sec, started + timeout_sec) - time.monotonic()
+        try:
+            if budget <= 0:
+                # deadline already spent: accept only if it is already there
+                if page.locator(selector).count() > 0:
+                    continue
+                raise PWTimeout(f"deadline exceeded waiting for {selector}")
+            page.wait_for_selector(
+                selector, state="attached", timeout=budget * 1000)
+        except PWTimeout:
+            if required:
+                raise
+            logger.info("nav_selector_missing", extra={"kv": {
+                "step": "navigation", "selector": selector, "deadline_sec": deadline_sec}})
+
+
+def navigate(page, url: str, timeout_sec: int, strategy: str = "load",
+             ready: Iterable[ReadySelector] = (), dead_path_prefixes: Iterable[str] = ()) -> None:
+    """Navigate ``page`` to ``url`` using ``strategy``; see module docstring.
+    Raises PermanentNavigationError on 404/410 or when the path of the final URL starts
+    with one of ``dead_path_prefixes`` (e.g. Trustnet redirecting a closed fund to search)."""
+    if strategy not in NAV_STRATEGIES:
+        raise ValueError(f"unknown navigation strategy {strategy!r}")
+    started = time.monotonic()
+    response = page.goto(url, timeout=timeout_sec * 1000, wait_until=strategy)
+    if response is not None and response.status in PERMANENT_STATUSES:
+        raise PermanentNavigationError(f"http_{response.status}")
+    final_path = urlsplit(page.url or "").path.lower()
+    if any(final_path.startswith(p) for p in dead_path_prefixes):
+        raise PermanentNavigationError("redirected_to_search")
+    if strategy == "load":
+        return
+    wait_ready(page, ready, started, timeout_sec)
+    # Extraction preconditions met: abort the rest of the load (ads, trackers).
+    try:
+        page.evaluate("window.stop()")
+    except Exception:
+        pass
+    logger.info("nav_ready", extra={"kv": {
+        "step": "navigation", "url": url, "strategy": strategy,
+        "elapsed_ms": int((time.monotonic() - started) * 1000)}})
+
+
+def open_page(ctx, url: str, timeout_sec: int, strategy: str = "load",
+              ready: Iterable[ReadySelector] = (), dead_path_prefixes: Iterable[str] = ()):
+    """New page + ``navigate``; the page is closed if navigation fails so retries don't leak tabs."""
+    page = ctx.new_page()
+    try:
+        navigate(page, url, timeout_sec, strategy, ready, dead_path_prefixes)
+    except Exception:
+        try:
+            page.close()
+        except Exception:
+            pass
+        raise
+    return page
@@ -0,0 +1,83 @@
+"""Negative cache for dead fund URLs (``dead_urls.json`` in the output directory).
+
+Failures are classified as:
+- permanent: 404/410 or a redirect to search -> dead immediately
+- strike: ``performance_table_not_found`` -> dead after ``dead_after_runs`` runs in a row
+- transient: anything else (timeouts, network) -> never marks a fund dead, and breaks a
+  run of strikes
+
+Dead funds are skipped until their re-check time; each failed re-check doubles the
+interval (capped at ``MAX_RECHECK_HOURS``) and a successful scrape clears the entry.
+"""
+from __future__ import annotations
+from typing import Dict, Any, Optional, Tuple
+import time
+from tenacity import RetryError
+from .navigation import PermanentNavigationError
+from .json_store import JsonStore
+
+CACHE_FILENAME = "dead_urls.json"
+MAX_RECHECK_HOURS = 24 * 30
+
+PERMANENT = "permanent"
+STRIKE = "strike"
+TRANSIENT = "transient"
+
+
+def classify_failure(exc: BaseException) -> Tuple[str, str]:
+    """-> (reason, kind) with kind in PERMANENT / STRIKE / TRANSIENT."""
+    if isinstance(exc, RetryError) and exc.last_attempt.failed:
+        exc = exc.last_attempt.exception()
+    if isinstance(exc, PermanentNavigationError):
+        return str(exc), PERMANENT
+    reason = str(exc)
+    if "performance_table_not_found" in reason:
+        return "performance_table_not_found", STRIKE
+    return reason[:100], TRANSIENT
+
+
+class NegativeCache(JsonStore):
+    FILENAME = CACHE_FILENAME
+
+    def is_dead(self, key: str) -> bool:
+        return bool(self.entries.get(key, {}).get("dead"))
+
+    def skip(self, key: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """The entry if ``key`` is dead and not yet due for a re-check, else None."""
+        e = self.entries.get(key)
+        now = time.time() if now is None else now
+        if e and e.get("dead") and now < e.get("next_check", 0):
+            return e
+        return None
+
+    def record_success(self, key: str) -> bool:
+        """Clear ``key``; True if it was a dead fund that came back."""
+        e = self.entries.pop(key, None)
+        return bool(e and e.get("dead"))
+
+    def record_failure(self, key: str, url: str, exc: BaseException, dead_after_runs: int,
+                       recheck_hours: float, now: Optional[float] = None) -> Dict[str, Any]:
+        """Update ``key`` after a run in which all attempts failed; returns the entry."""
+        now = time.time() if now is None else now
+        reason, kind = classify_failure(exc)
+        e = self.entries.get(key) or {"url": url, "strikes": 0, "dead": False}
+        e.update({"url": url, "reason": reason, "kind": kind, "last_failed": now})
+        if kind == TRANSIENT:
+            if e["dead"]:
+                # re-check was inconclusive: try again after the same interval
+                e["next_check"] = now + e["interval_h"] * 3600
+            else:
+                # strikes must come in consecutive runs; this one breaks the series
+                e["strikes"] = 0
+                self.entries.pop(key, None)
+                return e
+        else:
+            e["strikes"] += 1
+            if e["dead"]:
+                e["interval_h"] = min(e["interval_h"] * 2, MAX_RECHECK_HOURS)
+                e["next_check"] = now + e["interval_h"] * 3600
+            elif kind == PERMANENT or e["strikes"] >= dead_after_runs:
+                e.update({"dead": True, "since": now, "interval_h": recheck_hours,
+                          "next_check": now + recheck_hours * 3600})
+        self.entries[key] = e
+        return e
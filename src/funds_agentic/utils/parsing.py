@@ -1,8 +1,73 @@
-"""Helpers to parse Trustnet page text into structured values."""
+"""Helpers to parse Trustnet page text into structured values.
+
+``parse_fund_figures`` is the single-pass, precompiled parser used by the scraper; the
+line-by-line helpers below it are kept as the reference behaviour it must match
+(see scripts/bench_parsing.py).
+"""
 from __future__ import annotations
 from typing import Dict, Any, Tuple
 import re
 
+PERF_KEYS = ("3m", "6m", "1y", "3y", "5y")
+QUARTILE_LABEL = "Quartile Ranking"
+
+# whitespace runs do not matter to \s*, so this also matches the un-collapsed line
+_PERF_HEADER = re.compile(r"\b3\s*m\b\s*\b6\s*m\b")
+_DIGITS = re.compile(r"(\d+)")
+# float() only ever accepts strings with a digit, nan or inf: skip the rest without raising
+_FLOATISH = re.compile(r"\d|nan|inf", re.IGNORECASE)
+# first whitespace-separated token containing a digit
+_PRICE_TOKEN = re.compile(r"\S*\d\S*")
+
+
+def _floats(line: str) -> list:
+    vals = []
+    for t in line.replace("%", "").split():
+        if _FLOATISH.search(t):
+            try:
+                vals.append(float(t))
+            except ValueError:
+                pass
+    return vals
+
+
+def parse_fund_figures(perf_text: str, unit_text: str | None = None) -> Dict[str, Any]:
+    """Performance values, quartile and price in one pass over each table text.
+
+    Same results as ``extract_perf_from_table_text`` + ``find_quartile_from_text`` on
+    ``perf_text`` and the first digit-bearing token of ``unit_text`` (through
+    ``clean_price_token``); stops reading as soon as everything is found.
+    """
+    out: Dict[str, Any] = dict.fromkeys(PERF_KEYS)
+    quartile = None
+    header_seen = perf_done = False
+    after_label = False  # previous non-blank line carried QUARTILE_LABEL
+    for raw in perf_text.splitlines():
+        ln = raw.strip()
+        if not ln:
+            continue
+        if header_seen and not perf_done:
+            out.update(zip(PERF_KEYS, _floats(ln)[:5]))
+            perf_done = True
+        elif not header_seen and _PERF_HEADER.search(ln):
+            header_seen = True
+        if quartile is None:
+            if after_label:
+                m = _DIGITS.search(ln)
+                if m:
+                    quartile = int(m.group(1))
+            after_label = quartile is None and QUARTILE_LABEL in ln
+        elif perf_done:
+            break
+    out["Quartile"] = quartile
+    price = None
+    if unit_text:
+        m = _PRICE_TOKEN.search(unit_text.replace("%", ""))
+        if m:
+            price = clean_price_token(m.group(0))
+    out["price"] = price
+    return out
+
 
 def extract_perf_from_table_text(text: str) -> Dict[str, float | None]:
     """Given a block of table text that includes a header line like '3 m 6 m 1 y 3 y 5 y',
@@ -0,0 +1,190 @@
+"""Crash-isolated process pool for browser work.
+
+Every worker is a spawned process that builds its own context once (``init``, e.g.
+launch Playwright and accept consent) and then asks the supervisor for work. The
+supervisor hands out one task at a time over a per-worker pipe, so it always knows
+which task each worker holds:
+- a worker that dies (crash, OOM kill) is replaced and its task re-queued
+- a worker holding a task longer than ``task_timeout_sec`` is killed and handled the same
+- a task that has taken down ``max_task_crashes`` workers is reported with WorkerLost
+Workers lost while holding a task are always replaced (``max_task_crashes`` already bounds
+how many one task can take down). Workers that die without a task, e.g. a browser that
+will not launch, are replaced until ``max_start_failures`` fail in a row with no worker
+becoming ready in between; only then are the remaining tasks reported as ``no_workers``.
+Pipes rather than one shared multiprocessing.Queue: killing a worker mid-write can
+corrupt a shared queue, but only ever breaks that worker's own pipe.
+"""
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from collections import deque
+import multiprocessing as mp
+from multiprocessing.connection import wait
+import os
+import time
+from .logging_setup import setup_logger
+
+logger = setup_logger()
+
+READY = "ready"
+DONE = "done"
+
+
+class WorkerLost(RuntimeError):
+    """The worker(s) running a task crashed or hung; the task was given up on."""
+
+
+def default_workers() -> int:
+    return max(1, os.cpu_count() or 1)
+
+
+def _worker_main(conn, init: Callable, work: Callable, close: Optional[Callable], cfg: Any) -> None:
+    try:
+        ctx = init(cfg)
+        conn.send((READY, None, None))
+        while True:
+            task = conn.recv()
+            if task is None:
+                break
+            task_id, payload = task
+            conn.send((DONE, task_id, work(ctx, cfg, payload)))
+    except (EOFError, BrokenPipeError, KeyboardInterrupt):
+        pass  # supervisor went away
+    finally:
+        if close is not None:
+            close()
+
+
+class _Worker:
+    __slots__ = ("wid", "proc", "conn", "task", "since", "ready")
+
+    def __init__(self, wid: int, proc, conn):
+        self.wid = wid
+        self.proc = proc
+        self.conn = conn
+        self.task: Optional[Tuple[int, Any]] = None
+        self.since = time.monotonic()  # spawn time, then dispatch time of ``task``
+        self.ready = False
+
+
+class ProcessPool:
+    """Run ``work(ctx, cfg, payload)`` for many payloads across ``workers`` processes.
+
+    ``init``, ``work`` and ``close`` must be module-level functions (they are pickled by
+    reference into spawned processes); ``cfg`` and payloads/results must be picklable.
+    """
+
+    def __init__(self, workers: int, init: Callable, work: Callable, close: Optional[Callable] = None,
+                 cfg: Any = None, task_timeout_sec: float = 300, start_timeout_sec: float = 180,
+                 max_task_crashes: int = 2, max_start_failures: Optional[int] = None):
+        self.workers = max(1, workers)
+        self.init, self.work, self.close, self.cfg = init, work, close, cfg
+        self.task_timeout_sec = task_timeout_sec
+        self.start_timeout_sec = start_timeout_sec
+        self.max_task_crashes = max_task_crashes
+        self.max_start_failures = (2 * self.workers if max_start_failures is None
+                                   else max_start_failures)
+        self.restarts = 0
+        self.start_failures = 0  # consecutive losses of workers without a task
+        self._mp = mp.get_context("spawn")  # fork + Playwright threads do not mix
+        self._next_wid = 0
+
+    def _spawn(self) -> _Worker:
+        parent, child = self._mp.Pipe()
+        wid = self._next_wid
+        self._next_wid += 1
+        proc = self._mp.Process(target=_worker_main, name=f"pool-worker-{wid}", daemon=True,
+                                args=(child, self.init, self.work, self.close, self.cfg))
+        proc.start()
+        child.close()
+        return _Worker(wid, proc, parent)
+
+    @staticmethod
+    def _kill(w: _Worker) -> None:
+        if w.proc.is_alive():
+            w.proc.kill()
+        w.proc.join(5)
+        w.conn.close()
+
+    def run(self, payloads: List[Any], on_result: Callable[[Any, Any, Optional[Exception]], None],
+            deadline: Optional[float] = None) -> List[Any]:
+        """Call ``on_result(payload, result, error)`` as results stream in (``error`` is a
+        WorkerLost when the task was given up on). Tasks not started before ``deadline``
+        (time.monotonic()) are returned unrun; tasks already running are allowed to finish.
+        """
+        pending = deque(enumerate(payloads))
+        skipped: List[Any] = []
+        crashes: Dict[int, int] = {}
+        workers: Dict[int, _Worker] = {}
+        for _ in range(min(self.workers, len(payloads))):
+            w = self._spawn()
+            workers[w.wid] = w
+
+        def lost(w: _Worker, reason: str) -> None:
+            self._kill(w)
+            del workers[w.wid]
+            logger.warning("worker_lost", extra={"kv": {
+                "step": "process_pool", "worker": w.wid, "reason": reason,
+                "exitcode": w.proc.exitcode, "task": None if w.task is None else w.task[0]}})
+            if w.task is not None:
+                idx, payload = w.task
+                crashes[idx] = crashes.get(idx, 0) + 1
+                if crashes[idx] >= self.max_task_crashes:
+                    on_result(payload, None, WorkerLost(f"worker_{reason}"))
+                else:
+                    pending.appendleft(w.task)
+            else:
+                self.start_failures += 1
+            if pending and self.start_failures < self.max_start_failures:
+                self.restarts += 1
+                nw = self._spawn()
+                workers[nw.wid] = nw
+
+        try:
+            while pending or any(w.task is not None for w in workers.values()):
+                if pending and deadline is not None and time.monotonic() > deadline:
+                    skipped.extend(payload for _, payload in pending)
+                    pending.clear()
+                    continue
+                if not workers:
+                    while pending:
+                        on_result(pending.popleft()[1], None, WorkerLost("no_workers"))
+                    break
+
+                by_conn = {w.conn: w for w in workers.values()}
+                for conn in wait(list(by_conn), timeout=0.5):
+                    w = by_conn[conn]
+                    try:
+                        kind, _, result = conn.recv()
+                    except (EOFError, OSError):
+                        lost(w, "exited")
+                        continue
+                    if kind == DONE and w.task is not None:
+                        payload = w.task[1]
+                        w.task = None
+                        on_result(payload, result, None)
+                    w.ready = True
+                    self.start_failures = 0
+
+                now = time.monotonic()
+                for w in list(workers.values()):
+                    if w.task is not None and now - w.since > self.task_timeout_sec:
+                        lost(w, "stalled")
+                    elif not w.ready and now - w.since > self.start_timeout_sec:
+                        lost(w, "start_timeout")
+                    elif w.ready and w.task is None and pending:
+                        w.task = pending.popleft()
+                        w.since = now
+                        try:
+                            w.conn.send(w.task)
+                        except (BrokenPipeError, OSError):
+                            lost(w, "exited")
+        finally:
+            for w in workers.values():
+                try:
+                    w.conn.send(None)
+                except (BrokenPipeError, OSError):
+                    pass
+            for w in workers.values():
+                w.proc.join(10)
+                self._kill(w)
+        return skipped
@@ -0,0 +1,266 @@
+"""Per-node profiling for ``--profile``: sampled stacks plus tracemalloc allocation reports.
+
+A daemon thread samples the stack of whichever thread is running a graph node every
+``interval`` seconds (``sys._current_frames``), so overhead is a fixed small cost per
+sample rather than per Python call. Stacks are cut at the node wrapper and rooted at
+the node name, and written in collapsed-stack format (``flamegraph.pl``, speedscope,
+inferno). Each sample is classified as:
+- browser: the stack is inside Playwright (waiting on the page)
+- python: the node thread used CPU since the previous sample (per-thread CPU clock)
+- idle: it did not, i.e. it was blocked in sleep/select/pipe waits (e.g. ``--workers``
+  supervising worker processes, which are not sampled themselves)
+which separates "Python is slow" from "the page is slow" from "waiting on something else".
+Where the platform has no per-thread CPU clock, non-browser samples count as python.
+
+Allocations: the sampler snapshots tracemalloc whenever traced memory grows past the
+last snapshot, so the report lists the sites live at the node's peak (temporary frames
+included), next to the net change over the node.
+"""
+from __future__ import annotations
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from collections import Counter
+import functools
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+BROWSER_MARKERS = (f"{os.sep}playwright{os.sep}", f"{os.sep}greenlet{os.sep}")
+# keep the profiler's own bookkeeping out of the allocation report
+_OWN_FILES = {tracemalloc.__file__, __file__}
+# a sample is "on CPU" if the thread ran for at least this share of the interval
+ON_CPU_SHARE = 0.5
+# re-snapshot once traced memory exceeds the last snapshot by this factor
+PEAK_GROWTH = 1.25
+PEAK_MIN_GROWTH = 4 << 20
+
+
+def _label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _thread_clock() -> Optional[int]:
+    """CPU clock of the calling thread, readable from other threads (Unix only)."""
+    try:
+        return time.pthread_getcpuclockid(threading.get_ident())
+    except (AttributeError, OSError):
+        return None
+
+
+def _cpu_time(clock: Optional[int]) -> Optional[float]:
+    if clock is None:
+        return None
+    try:
+        return time.clock_gettime(clock)
+    except OSError:
+        return None
+
+
+def _line_stats(snapshot) -> Dict[str, Tuple[int, int]]:
+    # filtering the aggregated lines is far cheaper than Snapshot.filter_traces on a
+    # peak snapshot with millions of traces
+    return {str(s.traceback[0]): (s.size, s.count) for s in snapshot.statistics("lineno")
+            if s.traceback[0].filename not in _OWN_FILES}
+
+
+def _top_sites(now: Dict[str, Tuple[int, int]], before: Dict[str, Tuple[int, int]],
+               top_n: int) -> List[Tuple[str, int, int]]:
+    """(site, size diff, count diff) of the largest allocations in ``now`` since ``before``."""
+    diff = []
+    for site, (size, count) in now.items():
+        size0, count0 = before.get(site, (0, 0))
+        if size > size0:
+            diff.append((site, size - size0, count - count0))
+    diff.sort(key=lambda d: d[1], reverse=True)
+    return diff[:top_n]
+
+
+class NodeProfile:
+    def __init__(self, name: str):
+        self.name = name
+        self.wall_sec = 0.0
+        self.cpu_sec = 0.0
+        self.calls = 0
+        self.stacks: Counter = Counter()  # every sample (wall clock)
+        self.cpu_stacks: Counter = Counter()  # python samples only
+        self.browser_samples = 0
+        self.idle_samples = 0
+        self.alloc_top: List[Tuple[str, int, int]] = []  # net over the node
+        self.alloc_peak_top: List[Tuple[str, int, int]] = []  # live at the peak
+        self.alloc_peak = 0
+
+    @property
+    def samples(self) -> int:
+        return sum(self.stacks.values())
+
+    @property
+    def python_samples(self) -> int:
+        return sum(self.cpu_stacks.values())
+
+
+class RunProfiler:
+    def __init__(self, interval: float = 0.01, top_n: int = 25, alloc: bool = True):
+        self.interval = interval
+        self.top_n = top_n
+        self.alloc = alloc
+        self.nodes: Dict[str, NodeProfile] = {}
+        self.active = False
+        # (node, thread ident, thread CPU clock) of the node running now
+        self._current: Optional[Tuple[str, int, Optional[int]]] = None
+        self._lock = threading.Lock()  # guards _current and the peak snapshot
+        self._peak_snapshot = None
+        self._peak_size = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._wrapper_code = None  # stacks are cut at this frame
+
+    # -- lifecycle -----------------------------------------------------------
+    def start(self) -> None:
+        self.nodes = {}
+        self.active = True
+        self._stop.clear()
+        if self.alloc:
+            tracemalloc.start(1)
+        self._thread = threading.Thread(
+            target=self._sample_loop, name="funds-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.active = False
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.alloc and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    # -- node wrapping -------------------------------------------------------
+    def wrap(self, name: str, fn: Callable[[Dict[str, Any]], Dict[str, Any]]):
+        @functools.wraps(fn)
+        def profiled_node(state):
+            if not self.active:
+                return fn(state)
+            prof = self.nodes.setdefault(name, NodeProfile(name))
+            before = None
+            if self.alloc and tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+                before = _line_stats(tracemalloc.take_snapshot())
+            with self._lock:
+                self._peak_snapshot = None
+                self._peak_size = tracemalloc.get_traced_memory()[0] if before is not None else 0
+                self._current = (name, threading.get_ident(), _thread_clock())
+            t0 = time.perf_counter()
+            c0 = time.thread_time()
+            try:
+                return fn(state)
+            finally:
+                prof.wall_sec += time.perf_counter() - t0
+                prof.cpu_sec += time.thread_time() - c0
+                prof.calls += 1
+                with self._lock:
+                    self._current = None
+                    at_peak, self._peak_snapshot = self._peak_snapshot, None
+                if before is not None:
+                    peak = tracemalloc.get_traced_memory()[1]
+                    after = _line_stats(tracemalloc.take_snapshot())
+                    prof.alloc_top = _top_sites(after, before, self.top_n)
+                    if peak >= prof.alloc_peak:  # report the heaviest call
+                        prof.alloc_peak = peak
+                        at_peak = _line_stats(at_peak) if at_peak is not None else after
+                        prof.alloc_peak_top = _top_sites(at_peak, before, self.top_n)
+        self._wrapper_code = profiled_node.__code__
+        return profiled_node
+
+    # -- sampling ------------------------------------------------------------
+    def _snapshot_if_peak(self, current) -> None:
+        size = tracemalloc.get_traced_memory()[0]
+        if size < max(self._peak_size * PEAK_GROWTH, self._peak_size + PEAK_MIN_GROWTH):
+            return
+        snapshot = tracemalloc.take_snapshot()  # aggregated once the node is done
+        with self._lock:
+            if self._current is current:
+                self._peak_snapshot, self._peak_size = snapshot, size
+
+    def _sample_loop(self) -> None:
+        last: Optional[Tuple[Any, float, Optional[float]]] = None  # (current, wall, cpu)
+        while not self._stop.wait(self.interval):
+            current = self._current
+            if current is None:
+                last = None
+                continue
+            name, ident, clock = current
+            now, cpu = time.monotonic(), _cpu_time(clock)
+            on_cpu = True
+            if last is not None and last[0] is current and cpu is not None and last[2] is not None:
+                on_cpu = cpu - last[2] >= ON_CPU_SHARE * (now - last[1])
+            elif cpu is not None:
+                last = (current, now, cpu)
+                continue  # first sample of this node: only sets the baseline
+            last = (current, now, cpu)
+
+            frame = sys._current_frames().get(ident)
+            stack: List[str] = []
+            browser = False
+            while frame is not None and frame.f_code is not self._wrapper_code:
+                code = frame.f_code
+                browser = browser or any(m in code.co_filename for m in BROWSER_MARKERS)
+                stack.append(_label(code))
+                frame = frame.f_back
+            prof = self.nodes.get(name)
+            if prof is None:
+                continue
+            stack.append(name)
+            collapsed = ";".join(reversed(stack))
+            prof.stacks[collapsed] += 1
+            if browser:
+                prof.browser_samples += 1
+            elif on_cpu:
+                prof.cpu_stacks[collapsed] += 1
+            else:
+                prof.idle_samples += 1
+            if self.alloc and tracemalloc.is_tracing():
+                self._snapshot_if_peak(current)
+
+    # -- reports -------------------------------------------------------------
+    def write(self, out_dir: str) -> Dict[str, str]:
+        os.makedirs(out_dir, exist_ok=True)
+        paths = {"wall_collapsed": os.path.join(out_dir, "wall.collapsed"),
+                 "cpu_collapsed": os.path.join(out_dir, "cpu.collapsed")}
+        for key, attr in (("wall_collapsed", "stacks"), ("cpu_collapsed", "cpu_stacks")):
+            with open(paths[key], "w", encoding="utf-8") as f:
+                for prof in self.nodes.values():
+                    for stack, n in getattr(prof, attr).most_common():
+                        f.write(f"{stack} {n}\n")
+        paths["summary"] = os.path.join(out_dir, "summary.txt")
+        with open(paths["summary"], "w", encoding="utf-8") as f:
+            f.write(self.summary())
+        return paths
+
+    def summary(self) -> str:
+        lines = [f"sampling interval {self.interval * 1000:.0f} ms, top {self.top_n}", ""]
+        lines.append(f"{'node':<24}{'wall s':>9}{'cpu s':>8}{'samples':>9}{'browser%':>10}"
+                     f"{'python%':>9}{'idle%':>8}{'peak MiB':>10}")
+        for p in self.nodes.values():
+            n = p.samples or 1
+            lines.append(
+                f"{p.name:<24}{p.wall_sec:>9.2f}{p.cpu_sec:>8.2f}{p.samples:>9}"
+                f"{p.browser_samples / n * 100:>10.1f}{p.python_samples / n * 100:>9.1f}"
+                f"{p.idle_samples / n * 100:>8.1f}{p.alloc_peak / 2**20:>10.1f}")
+        for p in self.nodes.values():
+            if not p.samples and not p.alloc_top:
+                continue
+            lines += ["", f"== {p.name}"]
+            self_time: Counter = Counter()
+            for stack, n in p.cpu_stacks.items():
+                self_time[stack.rsplit(";", 1)[-1]] += n
+            if self_time:
+                lines.append("  On-CPU self samples (Python, outside Playwright):")
+                lines += [f"    {n:>6}  {fn}" for fn, n in self_time.most_common(self.top_n)]
+            for title, sites in (("Allocations live at the peak (since node start):", p.alloc_peak_top),
+                                 ("Allocations retained after the node (net):", p.alloc_top)):
+                if sites:
+                    lines.append(f"  {title}")
+                    lines += [f"    {size / 1024:>9.1f} KiB {count:>+8}  {site}"
+                              for site, size, count in sites]
+        return "\n".join(lines) + "\n"
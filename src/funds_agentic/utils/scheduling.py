@@ -0,0 +1,57 @@
+"""Priority bookkeeping for scheduler mode (``--schedule-every``).
+
+A small JSON file in the output directory remembers, per fund URL, when it was last
+scraped successfully and the row it produced. Each cycle ranks ``fund_rows`` by
+``weight * (1 + staleness)`` so held / heavily weighted funds go first and refresh more
+often, while watchlist funds age up until they win a slot in the cycle's time budget.
+Rows not refreshed in a cycle are carried forward from the book, so every cycle still
+writes the full list.
+"""
+from __future__ import annotations
+from typing import Dict, Any, List, Optional
+import time
+from .json_store import JsonStore
+
+BOOK_FILENAME = "schedule_state.json"
+
+HELD_WEIGHT = 4.0
+# staleness assumed for never-scraped funds (in refresh intervals)
+UNSEEN_STALENESS = 10.0
+
+
+class ScheduleBook(JsonStore):
+    FILENAME = BOOK_FILENAME
+    INDENT = None  # rows make this file large
+
+    def last_ok(self, url: str) -> Optional[float]:
+        e = self.entries.get(url)
+        return e.get("ts") if e else None
+
+    def last_row(self, url: str) -> Optional[Dict[str, Any]]:
+        e = self.entries.get(url)
+        return e.get("row") if e else None
+
+    def mark(self, url: str, row: Dict[str, Any], now: Optional[float] = None) -> None:
+        self.entries[url] = {"ts": now if now is not None else time.time(), "row": row}
+
+
+def priority(rec: Dict[str, Any], last_ok: Optional[float], now: float,
+             held_refresh_min: float, watch_refresh_min: float) -> float:
+    """Higher is more urgent. Held funds weigh ``HELD_WEIGHT`` (+ holding %),
+    and staleness is measured in multiples of the fund's refresh interval."""
+    held = bool(rec.get("hold")) or bool(rec.get("holding_pct"))
+    weight = (HELD_WEIGHT if held else 1.0) * \
+        (1.0 + (rec.get("holding_pct") or 0.0) / 10.0)
+    interval = (held_refresh_min if held else watch_refresh_min) * 60.0
+    if last_ok is None:
+        staleness = UNSEEN_STALENESS
+    else:
+        staleness = max(0.0, now - last_ok) / max(1.0, interval)
+    return weight * (1.0 + staleness)
+
+
+def prioritize(rows: List[Dict[str, Any]], book: ScheduleBook, now: float,
+               held_refresh_min: float, watch_refresh_min: float) -> List[Dict[str, Any]]:
+    """Return ``rows`` ordered most-urgent first (stable for equal priorities)."""
+    return sorted(rows, key=lambda r: -priority(r, book.last_ok(r["url"]), now,
+                                                held_refresh_min, watch_refresh_min))
@@ -0,0 +1,126 @@
+"""Sink-agnostic planning for writing scraped results back into the tracking list.
+
+Given the sheet's header row and data rows, work out which result cells differ from
+what is already there. Sinks (Google Sheet, Excel) only apply the returned cells.
+"""
+from __future__ import annotations
+from typing import Dict, Any, List, Optional, Tuple
+import math
+import pandas as pd
+from .io_excel import resolve_columns, _norm_header
+from .fund_identity import fund_key
+
+# scraped columns written next to each URL row, in this order when appended
+RESULT_COLUMNS = ["price", "3m", "6m", "1y", "3y", "5y", "Quartile", "FERisk", "Sector"]
+# positional fallback when no URL header resolves, as in load_excel: F=url, G=hold, H=holding%
+LEGACY_COLUMNS = {"url": 5, "hold": 6, "holding": 7}
+
+Cell = Tuple[int, int, Any]  # (row, col) 0-based within the grid, new value
+
+
+def _blank_cell(v) -> bool:
+    return v is None or (isinstance(v, str) and not v.strip()) or (isinstance(v, float) and math.isnan(v))
+
+
+def used_width(grid: List[List[Any]]) -> int:
+    """Number of columns up to and including the last non-blank cell of any row."""
+    width = 0
+    for row in grid:
+        for i in range(len(row) - 1, width - 1, -1):
+            if not _blank_cell(row[i]):
+                width = i + 1
+                break
+    return width
+
+
+def locate_columns(headers: List[Any], overrides: Dict[str, Optional[str]],
+                   used_cols: int = 0) -> Tuple[Optional[int], Dict[str, int], List[Tuple[int, str]]]:
+    """Return (url column index, result column -> index, headers to append as (index, name)).
+
+    Result columns reuse a header of the same name; missing ones are appended after the
+    last used column (``used_cols``: the sheet's width including data rows, since legacy
+    sheets keep url/hold/holding under blank headers). The input url/hold/holding
+    columns are never used for results.
+    """
+    names = ["" if h is None else str(h) for h in headers]
+    width = max(used_width([names]), used_cols)
+    frame = pd.DataFrame(columns=[n or f"__blank{i}" for i, n in enumerate(names)])
+    inputs = {k: frame.columns.get_loc(v) if v in frame.columns else None
+              for k, v in resolve_columns(frame, overrides).items()}
+    if inputs["url"] is None and width > LEGACY_COLUMNS["url"]:
+        inputs = {k: i if i < width else None for k, i in LEGACY_COLUMNS.items()}
+    reserved = {i for i in inputs.values() if i is not None}
+
+    by_norm = {_norm_header(n): i for i, n in enumerate(names)
+               if n.strip() and i not in reserved}
+    positions: Dict[str, int] = {}
+    appended: List[Tuple[int, str]] = []
+    next_idx = width
+    for col in RESULT_COLUMNS:
+        idx = by_norm.get(_norm_header(col))
+        if idx is None:
+            idx = next_idx
+            next_idx += 1
+            appended.append((idx, col))
+        positions[col] = idx
+    return inputs["url"], positions, appended
+
+
+def _blank(v) -> bool:
+    return v is None or v == "" or (isinstance(v, float) and math.isnan(v))
+
+
+def same_value(old, new) -> bool:
+    """Compare an existing cell (often a formatted string) with a scraped value."""
+    if _blank(old) or _blank(new):
+        return _blank(old) and _blank(new)
+    try:
+        return math.isclose(float(str(old).replace("%", "").replace(",", "")), float(new),
+                            rel_tol=0, abs_tol=1e-9)
+    except (TypeError, ValueError):
+        return str(old).strip() == str(new).strip()
+
+
+def results_by_key(results: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    return {r.get("fundKey") or fund_key(r["url"]): r for r in results if r.get("url")}
+
+
+def plan_updates(headers: List[Any], rows: List[List[Any]], results: List[Dict[str, Any]],
+                 overrides: Dict[str, Optional[str]], used_cols: Optional[int] = None) -> List[Cell]:
+    """Changed cells for ``results`` (scraped rows matched to sheet rows by fund key,
+    so every listed duplicate of a fund gets the same numbers).
+
+    ``rows`` are the data rows under ``headers``; returned coordinates are 0-based with
+    row 0 = the header row, so header cells for appended columns are included too.
+    ``used_cols`` defaults to the width used by ``headers`` and ``rows``.
+    """
+    if used_cols is None:
+        used_cols = used_width([headers, *rows])
+    url_idx, positions, appended = locate_columns(headers, overrides, used_cols)
+    if url_idx is None:
+        return []
+    by_key = results_by_key(results)
+
+    cells: List[Cell] = [(0, idx, name) for idx, name in appended]
+    for i, row in enumerate(rows, start=1):
+        url = row[url_idx] if url_idx < len(row) else None
+        res = by_key.get(fund_key(str(url))) if not _blank(url) else None
+        if res is None:
+            continue
+        for col, idx in positions.items():
+            new = res.get(col)
+            old = row[idx] if idx < len(row) else None
+            if not same_value(old, new):
+                cells.append((i, idx, None if _blank(new) else new))
+    return cells
+
+
+def group_runs(cells: List[Cell]) -> List[Tuple[int, int, List[Any]]]:
+    """Merge horizontally adjacent cells into (row, first col, values) runs."""
+    runs: List[Tuple[int, int, List[Any]]] = []
+    for r, c, v in sorted(cells, key=lambda x: (x[0], x[1])):
+        if runs and runs[-1][0] == r and runs[-1][1] + len(runs[-1][2]) == c:
+            runs[-1][2].append(v)
+        else:
+            runs.append((r, c, [v]))
+    return runs